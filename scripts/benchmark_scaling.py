@@ -0,0 +1,112 @@
+"""
+Time parts of Black on generated inputs of doubling size, to check that they scale
+linearly.  The time should roughly double from one row to the next, so the ratio
+column should stay close to 2.
+
+Run ``python scripts/benchmark_scaling.py [CASE ...]``, by default all cases run.
+"""
+
+import sys
+import timeit
+from functools import lru_cache
+from typing import Callable, Dict, List, Tuple
+
+from blackish import get_features_used
+from blackish.comments import normalize_fmt_off
+from blackish.mode import TargetVersion
+from blackish.parsing import lib2to3_parse
+
+SIZES = [1000, 2000, 4000, 8000, 16000]
+
+
+def comment_heavy(size: int) -> str:
+    """A license header and an indented block, both of `size` comment lines."""
+    lines: List[str] = [
+        f"# Licensed under the terms of clause {i}." for i in range(size)
+    ]
+    lines.append("def f():")
+    lines.append("    x = 1")
+    lines.extend(f"    # What happens on line {i}." for i in range(size))
+    # The comments are in the prefix of the dedent before `y`.
+    lines.append("y = 2")
+    return "\n".join(lines) + "\n"
+
+
+def soft_keyword_heavy(size: int) -> str:
+    """`size` statements using `match` as a name, so the parser looks ahead."""
+    return "".join(f"m{i} = re.match(pattern, text)\n" for i in range(size))
+
+
+def parse_py310(src: str) -> object:
+    return lib2to3_parse(src, {TargetVersion.PY310})
+
+
+def deeply_nested(size: int) -> str:
+    """Statements with lists nested 25 deep, about `size` leaves in total."""
+    item = "[" * 25 + "1" + "]" * 25
+    return "".join(f"x{i} = {item}\n" for i in range(size // 50))
+
+
+# Only the first of the repeated runs parses, so the best time is the walk's.
+parse_once = lru_cache(maxsize=1)(lib2to3_parse)
+
+
+def walk_tree(src: str) -> object:
+    node = parse_once(src)
+    for _ in node.pre_order():
+        pass
+    for _ in node.post_order():
+        pass
+    for _ in node.leaves():
+        pass
+    return get_features_used(node)
+
+
+def fmt_off_heavy(size: int) -> str:
+    """`size` lines, alternating `# fmt: off` regions and `# fmt: skip` lines."""
+    lines: List[str] = []
+    for i in range(size // 5):
+        lines.append("# fmt: off")
+        lines.append(f"x{i} = [1,  2]")
+        lines.append(f"z{i} = (3,)")
+        lines.append("# fmt: on")
+        lines.append(f"y{i} = 1  # fmt: skip")
+    return "\n".join(lines) + "\n"
+
+
+def parse_and_normalize_fmt_off(src: str) -> object:
+    node = lib2to3_parse(src)
+    normalize_fmt_off(node, preview=False)
+    return node
+
+
+CASES: Dict[str, Tuple[Callable[[int], str], Callable[[str], object]]] = {
+    "comments": (comment_heavy, lib2to3_parse),
+    "soft-keywords": (soft_keyword_heavy, parse_py310),
+    "nesting": (deeply_nested, walk_tree),
+    "fmt-off": (fmt_off_heavy, parse_and_normalize_fmt_off),
+}
+
+
+def run(name: str) -> None:
+    generate, function = CASES[name]
+    print(f"{name}:")
+    previous = 0.0
+    for size in SIZES:
+        src = generate(size)
+        seconds = min(timeit.repeat(lambda: function(src), number=1, repeat=3))
+        ratio = f"{seconds / previous:6.2f}" if previous else ""
+        print(f"  {size:>7} {seconds:10.4f}s {ratio}")
+        previous = seconds
+
+
+def main(names: List[str]) -> None:
+    for name in names or CASES:
+        if name not in CASES:
+            sys.exit(f"Unknown case {name!r}, choose from: {', '.join(CASES)}")
+
+        run(name)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,89 @@
+"""
+Generate ``src/blib2to3/_grammar_tables.py`` from the grammar files next to it.
+
+The parser tables are stored as Python literals, so that loading them is just an
+import (which mypyc can compile) instead of running pgen or unpickling a cached
+copy of its output. Run this after changing ``Grammar.txt`` or
+``PatternGrammar.txt``; with ``--check`` it only reports whether the tables are
+up to date.
+"""
+
+import os
+import sys
+from typing import Any, Dict, List
+
+from blib2to3.pgen2 import pgen
+
+BLIB2TO3_DIR = os.path.join(os.path.dirname(__file__), "..", "src", "blib2to3")
+TABLES_FILE = os.path.join(BLIB2TO3_DIR, "_grammar_tables.py")
+GRAMMARS = {
+    "GRAMMAR": "Grammar.txt",
+    "PATTERN_GRAMMAR": "PatternGrammar.txt",
+}
+
+
+def format_tables(name: str, tables: Dict[str, Any]) -> List[str]:
+    # The DFAs in `dfas` are the ones in `states`, so they're shared instead of
+    # being written twice.
+    states = tables["states"]
+    assert all(
+        dfa is states[number - 256] for number, (dfa, _) in tables["dfas"].items()
+    )
+    lines = [f"_{name}_STATES: List[DFA] = ["]
+    lines.extend(f"    {dfa!r}," for dfa in states)
+    lines.append("]")
+    lines.append(f"{name}: Dict[str, Any] = {{")
+    for key, value in tables.items():
+        if key == "states":
+            lines.append(f"    {key!r}: _{name}_STATES,")
+        elif key == "dfas":
+            lines.append(f"    {key!r}: {{")
+            lines.extend(
+                f"        {number!r}: (_{name}_STATES[{number - 256}], {first!r}),"
+                for number, (_, first) in value.items()
+            )
+            lines.append("    },")
+        else:
+            lines.append(f"    {key!r}: {value!r},")
+    lines.append("}")
+    return lines
+
+
+def generate() -> str:
+    lines = [
+        "# Generated by scripts/generate_grammar_tables.py from Grammar.txt and",
+        "# PatternGrammar.txt.  Don't edit, regenerate it instead.",
+        "from typing import Any, Dict, List",
+        "",
+        "from .pgen2.grammar import DFA",
+    ]
+    for name, filename in GRAMMARS.items():
+        grammar = pgen.generate_grammar(os.path.join(BLIB2TO3_DIR, filename))
+        lines.append("")
+        lines.extend(format_tables(name, grammar.__dict__))
+    return "\n".join(lines) + "\n"
+
+
+def main(check: bool) -> None:
+    tables = generate()
+    try:
+        with open(TABLES_FILE, encoding="utf-8") as fd:
+            current = fd.read()
+    except FileNotFoundError:
+        current = ""
+    if tables == current:
+        return
+
+    if check:
+        print(
+            f"{TABLES_FILE} is out of date, run scripts/generate_grammar_tables.py"
+            " to regenerate it."
+        )
+        sys.exit(1)
+
+    with open(TABLES_FILE, "w", encoding="utf-8") as fd:
+        fd.write(tables)
+
+
+if __name__ == "__main__":
+    main(check="--check" in sys.argv[1:])
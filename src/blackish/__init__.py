@@ -1,11 +1,9 @@
-import asyncio
 from json.decoder import JSONDecodeError
 import json
 from contextlib import contextmanager
 from datetime import datetime
 from enum import Enum
 import io
-from multiprocessing import Manager, freeze_support
 import os
 from pathlib import Path
 from pathspec.patterns.gitwildmatch import GitWildMatchPatternError
@@ -20,6 +18,7 @@ from typing import (
     Any,
     Dict,
     Generator,
+    Iterable,
     Iterator,
     List,
     MutableMapping,
@@ -34,19 +33,23 @@ from typing import (
 
 import click
 from click.core import ParameterSource
-from dataclasses import replace
+from dataclasses import dataclass, replace
+from itertools import repeat, zip_longest
 from mypy_extensions import mypyc_attr
 
 from blackish.const import DEFAULT_LINE_LENGTH, DEFAULT_INCLUDES, DEFAULT_EXCLUDES
-from blackish.const import STDIN_PLACEHOLDER
+from blackish.const import STDIN_PLACEHOLDER, PYTHON_CELL_MAGICS
 from blackish.nodes import STARS, syms, is_simple_decorator_expression
 from blackish.nodes import is_string_token
 from blackish.lines import Line, EmptyLineTracker
 from blackish.linegen import transform_line, LineGenerator, LN
-from blackish.comments import normalize_fmt_off
+from blackish.comments import has_fmt_pass_comment, normalize_fmt_off
 from blackish.mode import FUTURE_FLAG_TO_FEATURE, Mode, TargetVersion
 from blackish.mode import Feature, supports_feature, VERSION_TO_FEATURES
-from blackish.cache import read_cache, write_cache, get_cache_info, filter_cached, Cache
+from blackish.cache import read_cache, write_cache, filter_cached, Cache
+from blackish.cache import is_changed, touch_cache, get_cache_stats, prune_cache
+from blackish.cache import CacheStats, SourceInfo, SourceInfos, filter_shared
+from blackish.cache import export_cache, get_shared_cache_file
 from blackish.concurrency import cancel, shutdown, maybe_install_uvloop
 from blackish.output import dump_to_file, ipynb_diff, diff, color_diff, out, err
 from blackish.report import Report, Changed, NothingChanged
@@ -57,18 +60,10 @@ from blackish.files import (
     find_user_pyproject_toml,
 )
 from blackish.files import gen_python_files, get_gitignore, normalize_path_maybe_ignore
-from blackish.files import wrap_stream_for_windows
+from blackish.files import wrap_stream_for_windows, jupyter_dependencies_are_installed
 from blackish.parsing import InvalidInput  # noqa F401
-from blackish.parsing import lib2to3_parse, parse_ast, stringify_ast
-from blackish.handle_ipynb_magics import (
-    mask_cell,
-    unmask_cell,
-    remove_trailing_semicolon,
-    put_trailing_semicolon_back,
-    TRANSFORMED_MAGICS,
-    PYTHON_CELL_MAGICS,
-    jupyter_dependencies_are_installed,
-)
+from blackish.parsing import lib2to3_parse, parse_ast, parse_with_grammar
+from blackish.parsing import stringify_ast
 
 
 # lib2to3 fork
@@ -78,6 +73,7 @@ from blib2to3.pgen2 import token
 from _blackish_version import version as __version__
 
 if TYPE_CHECKING:
+    import asyncio
     from concurrent.futures import Executor
 
 COMPILED = Path(__file__).suffix in (".pyd", ".so")
@@ -112,6 +108,14 @@ class WriteBack(Enum):
 FileMode = Mode
 
 DEFAULT_WORKERS = os.cpu_count()
+# Files are sent to worker processes in batches of at most this many bytes.
+MAX_BATCH_SIZE = 256 * 1024
+# Smaller batches are used for smaller runs so that every worker gets a few of them.
+BATCHES_PER_WORKER = 4
+# The top-level statements of a single file of at least this many bytes are
+# formatted in parallel, in groups of about `PARALLEL_GROUP_SIZE` characters.
+PARALLEL_FILE_SIZE = 512 * 1024
+PARALLEL_GROUP_SIZE = 64 * 1024
 
 
 def read_pyproject_toml(
@@ -365,6 +369,28 @@ def validate_regex(
     show_default=True,
     help="Number of parallel workers",
 )
+@click.option(
+    "--cache-stats",
+    is_flag=True,
+    help="Show how many files are remembered in the cache of every mode and exit.",
+)
+@click.option(
+    "--cache-prune",
+    is_flag=True,
+    help=(
+        "Remove cache entries of files that no longer exist, the least recently used"
+        " entries beyond the maximum cache size and the caches of modes that weren't"
+        " used recently, then exit."
+    ),
+)
+@click.option(
+    "--cache-export",
+    is_flag=True,
+    help=(
+        "Add the files remembered in the cache to the shared cache in"
+        " BLACK_SHARED_CACHE_DIR, after formatting SRC if given."
+    ),
+)
 @click.option(
     "-q",
     "--quiet",
@@ -439,19 +465,27 @@ def main(  # noqa: C901
     force_exclude: Optional[Pattern[str]],
     stdin_filename: Optional[str],
     workers: int,
+    cache_stats: bool,
+    cache_prune: bool,
+    cache_export: bool,
     src: Tuple[str, ...],
     config: Optional[str],
 ) -> None:
     """The uncompromising code formatter."""
     ctx.ensure_object(dict)
 
+    if cache_stats or cache_prune:
+        stats = prune_cache() if cache_prune else get_cache_stats()
+        show_cache_stats(stats, pruned=cache_prune, quiet=quiet)
+        ctx.exit(0)
+
     if src and code is not None:
         out(
             main.get_usage(ctx)
             + "\n\n'SRC' and 'code' cannot be passed simultaneously."
         )
         ctx.exit(1)
-    if not src and code is None:
+    if not src and code is None and not cache_export:
         out(main.get_usage(ctx) + "\n\nOne of 'SRC' or 'code' is required.")
         ctx.exit(1)
 
@@ -510,6 +544,9 @@ def main(  # noqa: C901
     if ipynb and pyi:
         err("Cannot pass both `pyi` and `ipynb` flags!")
         ctx.exit(1)
+    if cache_export and code is not None:
+        err("Cannot pass both `code` and `cache-export`!")
+        ctx.exit(1)
 
     write_back = WriteBack.from_configuration(check=check, diff=diff, color=color)
     if target_version:
@@ -536,11 +573,16 @@ def main(  # noqa: C901
 
     report = Report(check=check, diff=diff, quiet=quiet, verbose=verbose)
 
+    if cache_export and get_shared_cache_file(mode) is None:
+        err("Set BLACK_SHARED_CACHE_DIR to the shared cache to export to.")
+        ctx.exit(1)
+
     if code is not None:
         reformat_code(
             content=code, fast=fast, write_back=write_back, mode=mode, report=report
         )
-    else:
+    elif src:
+        infos: Dict[Path, SourceInfo] = {}
         try:
             sources = get_sources(
                 ctx=ctx,
@@ -553,6 +595,7 @@ def main(  # noqa: C901
                 force_exclude=force_exclude,
                 report=report,
                 stdin_filename=stdin_filename,
+                infos=infos,
             )
         except GitWildMatchPatternError:
             ctx.exit(1)
@@ -572,6 +615,7 @@ def main(  # noqa: C901
                 write_back=write_back,
                 mode=mode,
                 report=report,
+                workers=workers,
             )
         else:
             reformat_many(
@@ -581,8 +625,17 @@ def main(  # noqa: C901
                 mode=mode,
                 report=report,
                 workers=workers,
+                infos=infos,
             )
 
+    if cache_export:
+        count = export_cache(mode)
+        if verbose or not quiet:
+            shared_cache_file = get_shared_cache_file(mode)
+            out(f"The shared cache at {shared_cache_file} has {count} entries.")
+        if not src:
+            ctx.exit(0)
+
     if verbose or not quiet:
         if code is None and (verbose or report.change_count or report.failure_count):
             out()
@@ -604,8 +657,13 @@ def get_sources(
     force_exclude: Optional[Pattern[str]],
     report: "Report",
     stdin_filename: Optional[str],
+    infos: Optional[Dict[Path, SourceInfo]] = None,
 ) -> Set[Path]:
-    """Compute the set of files to be formatted."""
+    """Compute the set of files to be formatted.
+
+    If `infos` is given, what's learned about the files found in directories while
+    looking for them is stored in it, see `gen_python_files`.
+    """
     sources: Set[Path] = set()
 
     if exclude is None:
@@ -659,6 +717,7 @@ def get_sources(
                     gitignore,
                     verbose=verbose,
                     quiet=quiet,
+                    infos=infos,
                 )
             )
         elif s == "-":
@@ -680,6 +739,32 @@ def path_empty(
         ctx.exit(0)
 
 
+def show_cache_stats(stats: List[CacheStats], *, pruned: bool, quiet: bool) -> None:
+    """Report on the caches of all modes described by `stats`.
+
+    If `pruned` is True, `stats` are the results of pruning the caches.
+    """
+    if quiet:
+        return
+
+    for mode_stats in stats:
+        msg = f"{mode_stats.key}: "
+        if mode_stats.expired:
+            msg += f"removed, unused for a while ({mode_stats.entries} entries)"
+        else:
+            msg += f"{mode_stats.entries} entries"
+            if mode_stats.size is not None:
+                msg += f", {mode_stats.size} bytes"
+            if pruned:
+                msg += (
+                    f" (removed {mode_stats.missing} entries of missing files and"
+                    f" {mode_stats.evicted} least recently used entries)"
+                )
+        out(msg)
+    if not stats:
+        out("The cache is empty.")
+
+
 def reformat_code(
     content: str, fast: bool, write_back: WriteBack, mode: Mode, report: Report
 ) -> None:
@@ -708,12 +793,23 @@ def reformat_code(
 # not ideal, but this shouldn't cause any issues ... hopefully. ~ichard26
 @mypyc_attr(patchable=True)
 def reformat_one(
-    src: Path, fast: bool, write_back: WriteBack, mode: Mode, report: "Report"
+    src: Path,
+    fast: bool,
+    write_back: WriteBack,
+    mode: Mode,
+    report: "Report",
+    workers: Optional[int] = 1,
+    executor: Optional["Executor"] = None,
 ) -> None:
-    """Reformat a single file under `src` without spawning child processes.
+    """Reformat a single file under `src`.
 
     `fast`, `write_back`, and `mode` options are passed to
     :func:`format_file_in_place` or :func:`format_stdin_to_stdout`.
+
+    No child processes are spawned, unless `workers` allows more than one and the
+    file is at least `PARALLEL_FILE_SIZE` bytes: its top-level statements are then
+    formatted in parallel. If `executor` is given, they're formatted with it rather
+    than a new pool, see :func:`new_worker_pool`.
     """
     try:
         changed = Changed.NO
@@ -738,13 +834,21 @@ def reformat_one(
         else:
             cache: Cache = {}
             if write_back not in (WriteBack.DIFF, WriteBack.COLOR_DIFF):
-                cache = read_cache(mode)
+                cache = read_cache(mode, [src])
                 res_src = src.resolve()
-                res_src_s = str(res_src)
-                if res_src_s in cache and cache[res_src_s] == get_cache_info(res_src):
+                if not is_changed(res_src, cache.get(str(res_src))):
+                    changed = Changed.CACHED
+                    touch_cache(cache, [src], mode)
+                elif filter_shared([src], mode)[1]:
                     changed = Changed.CACHED
-            if changed is not Changed.CACHED and format_file_in_place(
-                src, fast=fast, write_back=write_back, mode=mode
+                    write_cache(cache, [src], mode)
+            if changed is not Changed.CACHED and format_big_file_in_place(
+                src,
+                fast=fast,
+                write_back=write_back,
+                mode=mode,
+                workers=workers,
+                executor=executor,
             ):
                 changed = Changed.YES
             if (write_back is WriteBack.YES and changed is not Changed.CACHED) or (
@@ -758,6 +862,42 @@ def reformat_one(
         report.failed(src, str(exc))
 
 
+def format_big_file_in_place(
+    src: Path,
+    fast: bool,
+    mode: Mode,
+    write_back: WriteBack,
+    workers: Optional[int],
+    executor: Optional["Executor"] = None,
+) -> bool:
+    """Format file under `src` path with :func:`format_file_in_place`, using a pool
+    of `workers` processes if the file is big enough to benefit from it.
+
+    If `executor` is given, it's used instead of a new pool.
+    """
+    if src.stat().st_size < PARALLEL_FILE_SIZE:
+        return format_file_in_place(src, fast=fast, mode=mode, write_back=write_back)
+
+    if executor is not None:
+        return format_file_in_place(
+            src, fast=fast, mode=mode, write_back=write_back, executor=executor
+        )
+
+    if get_worker_count(workers) == 1:
+        return format_file_in_place(src, fast=fast, mode=mode, write_back=write_back)
+
+    executor, worker_count = start_worker_pool(workers)
+    with executor:
+        if worker_count == 1:
+            return format_file_in_place(
+                src, fast=fast, mode=mode, write_back=write_back
+            )
+
+        return format_file_in_place(
+            src, fast=fast, mode=mode, write_back=write_back, executor=executor
+        )
+
+
 # diff-shades depends on being to monkeypatch this function to operate. I know it's
 # not ideal, but this shouldn't cause any issues ... hopefully. ~ichard26
 @mypyc_attr(patchable=True)
@@ -768,26 +908,25 @@ def reformat_many(
     mode: Mode,
     report: "Report",
     workers: Optional[int],
+    infos: Optional[Dict[Path, SourceInfo]] = None,
+    executor: Optional["Executor"] = None,
 ) -> None:
-    """Reformat multiple files using a ProcessPoolExecutor."""
-    from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+    """Reformat multiple files using a ProcessPoolExecutor.
 
-    executor: Executor
-    loop = asyncio.get_event_loop()
-    worker_count = workers if workers is not None else DEFAULT_WORKERS
-    if sys.platform == "win32":
-        # Work around https://bugs.python.org/issue26903
-        assert worker_count is not None
-        worker_count = min(worker_count, 60)
-    try:
-        executor = ProcessPoolExecutor(max_workers=worker_count)
-    except (ImportError, NotImplementedError, OSError):
-        # we arrive here if the underlying system does not support multi-processing
-        # like in AWS Lambda or Termux, in which case we gracefully fallback to
-        # a ThreadPoolExecutor with just a single worker (more workers would not do us
-        # any good due to the Global Interpreter Lock)
-        executor = ThreadPoolExecutor(max_workers=1)
+    `infos` holds what file discovery already knows about `sources`.
 
+    If `executor` is given, it's used instead of a new pool of `workers` processes,
+    and left running afterwards, see :func:`new_worker_pool`. `workers` should then
+    be the number of its workers.
+    """
+    import asyncio
+
+    worker_count = get_worker_count(workers)
+    own_executor = executor is None
+    if executor is None:
+        executor, worker_count = start_worker_pool(workers)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
     try:
         loop.run_until_complete(
             schedule_formatting(
@@ -798,54 +937,123 @@ def reformat_many(
                 report=report,
                 loop=loop,
                 executor=executor,
+                infos=infos,
+                workers=worker_count,
             )
         )
     finally:
-        shutdown(loop)
-        if executor is not None:
+        try:
+            shutdown(loop)
+        finally:
+            asyncio.set_event_loop(None)
+        if own_executor:
             executor.shutdown()
 
 
+def get_worker_count(workers: Optional[int]) -> int:
+    """Return how many worker processes to use if `workers` are asked for."""
+    worker_count = workers if workers is not None else DEFAULT_WORKERS
+    # os.cpu_count() returns None if it can't tell.
+    worker_count = worker_count or 1
+    if sys.platform == "win32":
+        # Work around https://bugs.python.org/issue26903
+        worker_count = min(worker_count, 60)
+    return worker_count
+
+
+def new_worker_pool(workers: Optional[int] = None) -> "Executor":
+    """Return a pool of `workers` processes to format files with.
+
+    Library users formatting files repeatedly can pass the pool to every call of
+    :func:`reformat_many` instead of paying for new processes each time. Shutting
+    it down is then up to them, e.g. by using it as a context manager.
+    """
+    executor, _ = start_worker_pool(workers)
+    return executor
+
+
+def start_worker_pool(workers: Optional[int]) -> Tuple["Executor", int]:
+    """Return a pool like :func:`new_worker_pool` and the number of its workers."""
+    from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+    worker_count = get_worker_count(workers)
+    try:
+        if sys.version_info >= (3, 7):
+            executor = ProcessPoolExecutor(
+                max_workers=worker_count, initializer=initialize_worker
+            )
+        else:
+            # Without an initializer, workers derive the grammars with their first
+            # file.
+            executor = ProcessPoolExecutor(max_workers=worker_count)
+    except (ImportError, NotImplementedError, OSError):
+        # we arrive here if the underlying system does not support multi-processing
+        # like in AWS Lambda or Termux, in which case we gracefully fallback to
+        # a ThreadPoolExecutor with just a single worker (more workers would not do us
+        # any good due to the Global Interpreter Lock)
+        return ThreadPoolExecutor(max_workers=1), 1
+
+    return executor, worker_count
+
+
+def initialize_worker() -> None:
+    """Get a worker process ready to format files.
+
+    The variants of the Python grammar are only derived when first needed. Do it
+    while the pool starts up rather than with the first batch of files.
+    """
+    from blackish.parsing import get_grammars
+
+    get_grammars(set())
+
+
 async def schedule_formatting(
     sources: Set[Path],
     fast: bool,
     write_back: WriteBack,
     mode: Mode,
     report: "Report",
-    loop: asyncio.AbstractEventLoop,
+    loop: "asyncio.AbstractEventLoop",
     executor: "Executor",
+    infos: Optional[Dict[Path, SourceInfo]] = None,
+    workers: Optional[int] = None,
 ) -> None:
     """Run formatting of `sources` in parallel using the provided `executor`.
 
     (Use ProcessPoolExecutors for actual parallelism.)
 
     `write_back`, `fast`, and `mode` options are passed to
-    :func:`format_file_in_place`.
+    :func:`format_file_in_place`. `infos` holds what file discovery already knows
+    about `sources`. `workers` is the number of workers of `executor`, used to
+    size the batches of files sent to them.
     """
+    import asyncio
+
+    infos = dict(infos) if infos else {}
     cache: Cache = {}
+    shared: Set[Path] = set()
     if write_back not in (WriteBack.DIFF, WriteBack.COLOR_DIFF):
-        cache = read_cache(mode)
-        sources, cached = filter_cached(cache, sources)
-        for src in sorted(cached):
-            report.done(src, Changed.CACHED)
+        sources, shared, cache = skip_cached(sources, mode, report, infos)
     if not sources:
+        if shared:
+            write_cache(cache, shared, mode, infos)
         return
 
     cancelled = []
-    sources_to_cache = []
-    lock = None
-    if write_back in (WriteBack.DIFF, WriteBack.COLOR_DIFF):
-        # For diff output, we need locks to ensure we don't interleave output
-        # from different processes.
-        manager = Manager()
-        lock = manager.Lock()
+    # Files known to be well formatted from the shared cache are remembered in the
+    # user's cache too, so that the next run can skip them without reading them.
+    sources_to_cache = sorted(shared)
+    # Diffs are written out in path order, each one as soon as the files before it
+    # are done, so that the output doesn't depend on which worker finished first.
+    order = sorted(sources)
+    next_diff = 0
+    diffs: Dict[Path, Optional[FileDiff]] = {}
+    batches = batch_by_size(order_by_size(sources, infos), infos, workers or 1)
     tasks = {
         asyncio.ensure_future(
-            loop.run_in_executor(
-                executor, format_file_in_place, src, fast, mode, write_back, lock
-            )
-        ): src
-        for src in sorted(sources)
+            loop.run_in_executor(executor, format_files, batch, fast, mode, write_back)
+        ): batch
+        for batch in batches
     }
     pending = tasks.keys()
     try:
@@ -857,13 +1065,26 @@ async def schedule_formatting(
     while pending:
         done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
         for task in done:
-            src = tasks.pop(task)
+            batch = tasks.pop(task)
             if task.cancelled():
                 cancelled.append(task)
-            elif task.exception():
-                report.failed(src, str(task.exception()))
-            else:
-                changed = Changed.YES if task.result() else Changed.NO
+                continue
+
+            exc = task.exception()
+            results: List[Union[bool, FileDiff, FormatError]]
+            results = [FormatError(str(exc))] * len(batch) if exc else task.result()
+            for src, result in zip(batch, results):
+                diffs[src] = result if isinstance(result, FileDiff) else None
+                if isinstance(result, FormatError):
+                    report.failed(src, result.message)
+                    continue
+
+                changed = Changed.YES if result else Changed.NO
+                if write_back is WriteBack.YES and changed is Changed.YES:
+                    # The status seen during discovery is stale now.
+                    info = infos.get(src)
+                    if info is not None:
+                        infos[src] = replace(info, stat=None)
                 # If the file was written back or was successfully checked as
                 # well-formatted, store this information in the cache.
                 if write_back is WriteBack.YES or (
@@ -871,13 +1092,121 @@ async def schedule_formatting(
                 ):
                     sources_to_cache.append(src)
                 report.done(src, changed)
+            next_diff = write_ready_diffs(order, next_diff, diffs)
     if cancelled:
         if sys.version_info >= (3, 7):
             await asyncio.gather(*cancelled, return_exceptions=True)
         else:
             await asyncio.gather(*cancelled, loop=loop, return_exceptions=True)
+    # Files of cancelled batches never got done.
+    write_ready_diffs(sorted(diffs), 0, diffs)
     if sources_to_cache:
-        write_cache(cache, sources_to_cache, mode)
+        write_cache(cache, sources_to_cache, mode, infos)
+
+
+def skip_cached(
+    sources: Set[Path], mode: Mode, report: "Report", infos: SourceInfos
+) -> Tuple[Set[Path], Set[Path], Cache]:
+    """Report the `sources` that the caches know to be well formatted as cached.
+
+    Return the other sources, the ones only the shared cache knows, and the cache
+    for `mode`. `infos` holds what file discovery already knows about `sources`.
+    """
+    cache = read_cache(mode, sources, infos)
+    sources, cached = filter_cached(cache, sources, infos)
+    sources, shared = filter_shared(sources, mode)
+    for src in sorted(cached | shared):
+        report.done(src, Changed.CACHED)
+    if cached:
+        touch_cache(cache, cached, mode, infos)
+    return sources, shared, cache
+
+
+def get_source_size(src: Path, infos: SourceInfos) -> int:
+    """Return the size of `src` in bytes, or 0 if it can't be read."""
+    info = infos.get(src)
+    if info is not None and info.stat is not None:
+        return info.stat.st_size
+
+    try:
+        return src.stat().st_size
+    except OSError:
+        return 0
+
+
+def order_by_size(sources: Iterable[Path], infos: SourceInfos) -> List[Path]:
+    """Return `sources` sorted from the largest file to the smallest one.
+
+    Formatting time grows with file size, so starting the biggest files first keeps
+    one of them from running alone at the end of the run while other workers idle.
+    Files of the same size stay in path order.
+    """
+    return sorted(sources, key=lambda src: (-get_source_size(src, infos), src))
+
+
+def batch_by_size(
+    sources: Sequence[Path], infos: SourceInfos, workers: int
+) -> List[List[Path]]:
+    """Split `sources` into consecutive batches of about the same number of bytes.
+
+    Every batch is formatted by a worker in a single round trip, which saves
+    pickling arguments and results for each of many small files. Batches are kept
+    at most `MAX_BATCH_SIZE` bytes, and small enough for each of the `workers` to
+    get `BATCHES_PER_WORKER` of them, so that the load stays balanced. A file bigger
+    than that limit gets a batch of its own.
+    """
+    sizes = [get_source_size(src, infos) for src in sources]
+    limit = min(MAX_BATCH_SIZE, sum(sizes) // (workers * BATCHES_PER_WORKER))
+    batches: List[List[Path]] = []
+    batch: List[Path] = []
+    batch_size = 0
+    for src, size in zip(sources, sizes):
+        if batch and batch_size + size > limit:
+            batches.append(batch)
+            batch = []
+            batch_size = 0
+        batch.append(src)
+        batch_size += size
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+@dataclass(frozen=True)
+class FileDiff:
+    """A diff of a file, along with how the file writes its text."""
+
+    contents: str
+    encoding: str
+    newline: str
+
+
+@dataclass(frozen=True)
+class FormatError:
+    """The message of an error that kept a worker from formatting a file."""
+
+    message: str
+
+
+def format_files(
+    sources: List[Path],
+    fast: bool,
+    mode: Mode,
+    write_back: WriteBack = WriteBack.NO,
+) -> List[Union[bool, FileDiff, FormatError]]:
+    """Reformat a batch of files with :func:`format_file`.
+
+    Return whether each file was reformatted or its diff, or the error that
+    prevented it from being formatted, so that one broken file doesn't lose the
+    results of the rest of the batch.
+    """
+    results: List[Union[bool, FileDiff, FormatError]] = []
+    for src in sources:
+        try:
+            results.append(format_file(src, fast, mode, write_back))
+        except Exception as exc:
+            results.append(FormatError(str(exc)))
+    return results
 
 
 def format_file_in_place(
@@ -886,12 +1215,37 @@ def format_file_in_place(
     mode: Mode,
     write_back: WriteBack = WriteBack.NO,
     lock: Any = None,  # multiprocessing.Manager().Lock() is some crazy proxy
+    *,
+    executor: Optional["Executor"] = None,
 ) -> bool:
     """Format file under `src` path. Return True if changed.
 
     If `write_back` is DIFF, write a diff to stdout. If it is YES, write reformatted
     code to the file.
-    `mode` and `fast` options are passed to :func:`format_file_contents`.
+    `mode`, `fast` and `executor` options are passed to :func:`format_file_contents`.
+    """
+    result = format_file(src, fast, mode, write_back, executor=executor)
+    if isinstance(result, FileDiff):
+        with lock or nullcontext():
+            write_diff(result)
+        return True
+
+    return result
+
+
+def format_file(
+    src: Path,
+    fast: bool,
+    mode: Mode,
+    write_back: WriteBack = WriteBack.NO,
+    *,
+    executor: Optional["Executor"] = None,
+) -> Union[bool, FileDiff]:
+    """Format file under `src` path like :func:`format_file_in_place`, but return
+    the diff instead of writing it to stdout if `write_back` is DIFF.
+
+    This lets worker processes hand their diffs over to the main process, which
+    writes them all out in order.
     """
     if src.suffix == ".pyi":
         mode = replace(mode, is_pyi=True)
@@ -902,7 +1256,9 @@ def format_file_in_place(
     with open(src, "rb") as buf:
         src_contents, encoding, newline = decode_bytes(buf.read())
     try:
-        dst_contents = format_file_contents(src_contents, fast=fast, mode=mode)
+        dst_contents = format_file_contents(
+            src_contents, fast=fast, mode=mode, executor=executor
+        )
     except NothingChanged:
         return False
     except JSONDecodeError:
@@ -925,20 +1281,42 @@ def format_file_in_place(
         if write_back == WriteBack.COLOR_DIFF:
             diff_contents = color_diff(diff_contents)
 
-        with lock or nullcontext():
-            f = io.TextIOWrapper(
-                sys.stdout.buffer,
-                encoding=encoding,
-                newline=newline,
-                write_through=True,
-            )
-            f = wrap_stream_for_windows(f)
-            f.write(diff_contents)
-            f.detach()
+        return FileDiff(diff_contents, encoding, newline)
 
     return True
 
 
+def write_diff(file_diff: FileDiff) -> None:
+    """Write `file_diff` to stdout the way the file it comes from writes text."""
+    f = io.TextIOWrapper(
+        sys.stdout.buffer,
+        encoding=file_diff.encoding,
+        newline=file_diff.newline,
+        write_through=True,
+    )
+    f = wrap_stream_for_windows(f)
+    f.write(file_diff.contents)
+    f.detach()
+
+
+def write_ready_diffs(
+    order: List[Path], start: int, diffs: Dict[Path, Optional[FileDiff]]
+) -> int:
+    """Write the diffs of the files in `order` from index `start` on, until one
+    that isn't done yet. Return its index.
+
+    `diffs` maps the files that are done to their diff, if they have one. Those
+    that are written are removed from it.
+    """
+    index = start
+    while index < len(order) and order[index] in diffs:
+        file_diff = diffs.pop(order[index])
+        index += 1
+        if file_diff is not None:
+            write_diff(file_diff)
+    return index
+
+
 def format_stdin_to_stdout(
     fast: bool,
     *,
@@ -991,24 +1369,32 @@ def format_stdin_to_stdout(
 
 
 def check_stability_and_equivalence(
-    src_contents: str, dst_contents: str, *, mode: Mode
+    src_contents: str, dst_contents: str, *, mode: Mode, stable: bool = False
 ) -> None:
     """Perform stability and equivalence checks.
 
     Raise AssertionError if source and destination contents are not
     equivalent, or if a second pass of the formatter would format the
-    content differently.
+    content differently.  If `stable` is True, the formatter has already
+    been seen to leave `dst_contents` unchanged and it isn't formatted again.
     """
     assert_equivalent(src_contents, dst_contents)
-    assert_stable(src_contents, dst_contents, mode=mode)
+    if not stable:
+        assert_stable(src_contents, dst_contents, mode=mode)
 
 
-def format_file_contents(src_contents: str, *, fast: bool, mode: Mode) -> FileContent:
+def format_file_contents(
+    src_contents: str,
+    *,
+    fast: bool,
+    mode: Mode,
+    executor: Optional["Executor"] = None,
+) -> FileContent:
     """Reformat contents of a file and return new contents.
 
     If `fast` is False, additionally confirm that the reformatted code is
     valid by calling :func:`assert_equivalent` and :func:`assert_stable` on it.
-    `mode` is passed to :func:`format_str`.
+    `mode` and `executor` are passed to :func:`format_str`.
     """
     if not src_contents.strip():
         raise NothingChanged
@@ -1016,13 +1402,15 @@ def format_file_contents(src_contents: str, *, fast: bool, mode: Mode) -> FileCo
     if mode.is_ipynb:
         dst_contents = format_ipynb_string(src_contents, fast=fast, mode=mode)
     else:
-        dst_contents = format_str(src_contents, mode=mode)
+        dst_contents, stable = _format_str(src_contents, mode=mode, executor=executor)
     if src_contents == dst_contents:
         raise NothingChanged
 
     if not fast and not mode.is_ipynb:
         # Jupyter notebooks will already have been checked above.
-        check_stability_and_equivalence(src_contents, dst_contents, mode=mode)
+        check_stability_and_equivalence(
+            src_contents, dst_contents, mode=mode, stable=stable
+        )
     return dst_contents
 
 
@@ -1043,6 +1431,8 @@ def validate_cell(src: str, mode: Mode) -> None:
     Due to the impossibility of safely roundtripping in such situations, cells
     containing transformed magics will be ignored.
     """
+    from blackish.handle_ipynb_magics import TRANSFORMED_MAGICS
+
     if any(transformed_magic in src for transformed_magic in TRANSFORMED_MAGICS):
         raise NothingChanged
     if (
@@ -1068,6 +1458,10 @@ def format_cell(src: str, *, fast: bool, mode: Mode) -> str:
     could potentially be automagics or multi-line magics, which
     are currently not supported.
     """
+    from blackish.handle_ipynb_magics import mask_cell, unmask_cell
+    from blackish.handle_ipynb_magics import put_trailing_semicolon_back
+    from blackish.handle_ipynb_magics import remove_trailing_semicolon
+
     validate_cell(src, mode)
     src_without_trailing_semicolon, has_trailing_semicolon = remove_trailing_semicolon(
         src
@@ -1076,9 +1470,11 @@ def format_cell(src: str, *, fast: bool, mode: Mode) -> str:
         masked_src, replacements = mask_cell(src_without_trailing_semicolon)
     except SyntaxError:
         raise NothingChanged from None
-    masked_dst = format_str(masked_src, mode=mode)
+    masked_dst, stable = _format_str(masked_src, mode=mode)
     if not fast:
-        check_stability_and_equivalence(masked_src, masked_dst, mode=mode)
+        check_stability_and_equivalence(
+            masked_src, masked_dst, mode=mode, stable=stable
+        )
     dst_without_trailing_semicolon = unmask_cell(masked_dst, replacements)
     dst = put_trailing_semicolon_back(
         dst_without_trailing_semicolon, has_trailing_semicolon
@@ -1130,7 +1526,9 @@ def format_ipynb_string(src_contents: str, *, fast: bool, mode: Mode) -> FileCon
         raise NothingChanged
 
 
-def format_str(src_contents: str, *, mode: Mode) -> str:
+def format_str(
+    src_contents: str, *, mode: Mode, executor: Optional["Executor"] = None
+) -> str:
     """Reformat a string and return new contents.
 
     `mode` determines formatting options, such as how many characters per line are
@@ -1159,26 +1557,87 @@ def format_str(src_contents: str, *, mode: Mode) -> str:
     ) -> None:
         hey
 
+
+    If `executor` is given, big inputs are split into groups of top-level
+    statements that are formatted in parallel by it, see
+    :func:`format_statement_group`. The result is the same either way.
     """
-    dst_contents = _format_str_once(src_contents, mode=mode)
+    return _format_str(src_contents, mode=mode, executor=executor)[0]
+
+
+def _format_str(
+    src_contents: str, *, mode: Mode, executor: Optional["Executor"] = None
+) -> Tuple[str, bool]:
+    """Reformat a string like :func:`format_str`. Also return whether the result
+    is known to be stable, that is, whether it was seen to format to itself."""
+    dst_contents, added_commas = _format_str_pass(
+        src_contents, mode=mode, executor=executor
+    )
+    if src_contents == dst_contents:
+        return dst_contents, True
+
     # Forced second pass to work around optional trailing commas (becoming
     # forced trailing commas on pass 2) interacting differently with optional
-    # parentheses.  Admittedly ugly.
-    if src_contents != dst_contents:
-        return _format_str_once(dst_contents, mode=mode)
-    return dst_contents
+    # parentheses.  Admittedly ugly.  Without new trailing commas, the second pass
+    # has nothing to change.
+    if not added_commas:
+        return dst_contents, False
+
+    new_dst_contents = _format_str_once(dst_contents, mode=mode, executor=executor)
+    return new_dst_contents, new_dst_contents == dst_contents
+
+
+def _format_str_once(
+    src_contents: str, *, mode: Mode, executor: Optional["Executor"] = None
+) -> str:
+    return _format_str_pass(src_contents, mode=mode, executor=executor)[0]
+
+
+def _format_str_pass(
+    src_contents: str, *, mode: Mode, executor: Optional["Executor"] = None
+) -> Tuple[str, bool]:
+    """Format `src_contents` once. Return the result, and whether trailing commas
+    were added to it."""
+    src_node, grammar = parse_with_grammar(src_contents.lstrip(), mode.target_versions)
+    analysis = analyze_tree(src_node, mode=mode)
+    versions = analysis.versions
+
+    if executor is not None and not any(c in src_contents for c in ("fmt:", "yapf:")):
+        # Regions of `# fmt: off` might span groups, so they're formatted serially.
+        groups = split_statement_groups(src_node, PARALLEL_GROUP_SIZE)
+        if len(groups) > 1:
+            results = list(
+                executor.map(
+                    format_statement_group,
+                    *zip(*groups),
+                    repeat(mode),
+                    repeat(versions),
+                    repeat(grammar.version),
+                )
+            )
+            return (
+                "".join(dst for dst, _ in results),
+                any(added_commas for _, added_commas in results),
+            )
 
+    normalize_fmt_off(src_node, preview=mode.preview, leaves=analysis.fmt_pass_leaves)
+    return _format_node(src_node, mode=mode, versions=versions)
 
-def _format_str_once(src_contents: str, *, mode: Mode) -> str:
-    src_node = lib2to3_parse(src_contents.lstrip(), mode.target_versions)
-    dst_contents = []
-    future_imports = get_future_imports(src_node)
-    if mode.target_versions:
-        versions = mode.target_versions
-    else:
-        versions = detect_target_versions(src_node, future_imports=future_imports)
 
-    normalize_fmt_off(src_node, preview=mode.preview)
+def _format_node(
+    src_node: Node,
+    *,
+    mode: Mode,
+    versions: Set[TargetVersion],
+    start: Optional[Leaf] = None,
+) -> Tuple[str, bool]:
+    """Format the module `src_node`. Return the result, and whether trailing commas
+    were added to it.
+
+    If `start` is given, the lines before the one with the `start` leaf only serve
+    as context for the rest and aren't part of the result.
+    """
+    dst_contents = []
     lines = LineGenerator(mode=mode)
     elt = EmptyLineTracker(is_pyi=mode.is_pyi)
     empty_line = Line(mode=mode)
@@ -1188,15 +1647,86 @@ def _format_str_once(src_contents: str, *, mode: Mode) -> str:
         for feature in {Feature.TRAILING_COMMA_IN_CALL, Feature.TRAILING_COMMA_IN_DEF}
         if supports_feature(versions, feature)
     }
+    started = start is None
+    added_commas = False
     for current_line in lines.visit(src_node):
-        dst_contents.append(str(empty_line) * after)
+        if not started:
+            started = any(leaf is start for leaf in current_line.leaves)
+        if started:
+            dst_contents.append(str(empty_line) * after)
         before, after = elt.maybe_empty_lines(current_line)
+        if not started:
+            continue
+
         dst_contents.append(str(empty_line) * before)
         for line in transform_line(
             current_line, mode=mode, features=split_line_features
         ):
+            # Commas added when splitting lines aren't part of the tree.
+            added_commas = added_commas or any(
+                leaf.type == token.COMMA and leaf.parent is None for leaf in line.leaves
+            )
             dst_contents.append(str(line))
-    return "".join(dst_contents)
+    return "".join(dst_contents), added_commas
+
+
+def split_statement_groups(src_node: Node, group_size: int) -> List[Tuple[str, str]]:
+    """Split the source of the module `src_node` into groups of consecutive
+    top-level statements of at least `group_size` characters.
+
+    Return (context, group) pairs, where `context` is the source of the statement
+    right before the group, or an empty string for the first group.
+
+    Groups only start at statements that aren't preceded by comments, so that every
+    line of output comes from exactly one group.
+    """
+    groups: List[Tuple[str, str]] = []
+    context = ""
+    group: List[str] = []
+    group_len = 0
+    previous = ""
+    for child in src_node.children:
+        text = str(child)
+        if (
+            group_len >= group_size
+            and child.type != token.ENDMARKER
+            and not child.prefix.strip()
+        ):
+            groups.append((context, "".join(group)))
+            context = previous
+            group = []
+            group_len = 0
+        group.append(text)
+        group_len += len(text)
+        previous = text
+    groups.append((context, "".join(group)))
+    return groups
+
+
+def format_statement_group(
+    context: str,
+    group: str,
+    mode: Mode,
+    versions: Set[TargetVersion],
+    grammar_version: Optional[Tuple[int, int]] = None,
+) -> Tuple[str, bool]:
+    """Format a `group` of top-level statements from :func:`split_statement_groups`
+    like :func:`_format_node`.
+
+    Empty lines are tracked from the `context` statement on, so that the output
+    is exactly the part of the formatted module that comes from `group`. `versions`
+    are the target versions detected for the whole module, and `grammar_version`
+    the version of the grammar that parsed it.
+    """
+    src_node = lib2to3_parse(
+        (context + group).lstrip(),
+        mode.target_versions,
+        grammar_version=grammar_version,
+    )
+    start = None
+    if context:
+        start = next(src_node.children[1].leaves())
+    return _format_node(src_node, mode=mode, versions=versions, start=start)
 
 
 def decode_bytes(src: bytes) -> Tuple[FileContent, Encoding, NewLine]:
@@ -1216,7 +1746,43 @@ def decode_bytes(src: bytes) -> Tuple[FileContent, Encoding, NewLine]:
         return tiow.read(), encoding, newline
 
 
-def get_features_used(  # noqa: C901
+@dataclass
+class TreeAnalysis:
+    """What formatting a module needs to know about its tree.
+
+    It's collected by :func:`analyze_tree` in a single walk of the tree.
+    """
+
+    future_imports: Set[str]
+    #: The target versions of the mode, or the ones detected from the features used.
+    versions: Set[TargetVersion]
+    #: The leaves for which :func:`has_fmt_pass_comment` is true, in order.
+    fmt_pass_leaves: List[Leaf]
+
+
+def analyze_tree(node: Node, *, mode: Mode) -> TreeAnalysis:
+    """Look at every node of the module `node` once to collect a :class:`TreeAnalysis`.
+
+    Features are only looked for if `mode` has no target versions.
+    """
+    future_imports = get_future_imports(node)
+    detect_versions = not mode.target_versions
+    features = get_future_features(future_imports)
+    fmt_pass_leaves: List[Leaf] = []
+    for n in node.pre_order():
+        if detect_versions:
+            add_node_features(n, features)
+        if isinstance(n, Leaf) and has_fmt_pass_comment(n, preview=mode.preview):
+            fmt_pass_leaves.append(n)
+
+    if detect_versions:
+        versions = versions_supporting(features)
+    else:
+        versions = mode.target_versions
+    return TreeAnalysis(future_imports, versions, fmt_pass_leaves)
+
+
+def get_features_used(
     node: Node, *, future_imports: Optional[Set[str]] = None
 ) -> Set[Feature]:
     """Return a set of (relatively) new Python features used in this file.
@@ -1231,96 +1797,102 @@ def get_features_used(  # noqa: C901
     - usage of __future__ flags (annotations);
     - print / exec statements;
     """
-    features: Set[Feature] = set()
-    if future_imports:
-        features |= {
-            FUTURE_FLAG_TO_FEATURE[future_import]
-            for future_import in future_imports
-            if future_import in FUTURE_FLAG_TO_FEATURE
-        }
-
+    features = get_future_features(future_imports or set())
     for n in node.pre_order():
-        if is_string_token(n):
-            value_head = n.value[:2]
-            if value_head in {'f"', 'F"', "f'", "F'", "rf", "fr", "RF", "FR"}:
-                features.add(Feature.F_STRINGS)
-
-        elif n.type == token.NUMBER:
-            assert isinstance(n, Leaf)
-            if "_" in n.value:
-                features.add(Feature.NUMERIC_UNDERSCORES)
-
-        elif n.type == token.SLASH:
-            if n.parent and n.parent.type in {
-                syms.typedargslist,
-                syms.arglist,
-                syms.varargslist,
-            }:
-                features.add(Feature.POS_ONLY_ARGUMENTS)
-
-        elif n.type == token.COLONEQUAL:
-            features.add(Feature.ASSIGNMENT_EXPRESSIONS)
-
-        elif n.type == syms.decorator:
-            if len(n.children) > 1 and not is_simple_decorator_expression(
-                n.children[1]
-            ):
-                features.add(Feature.RELAXED_DECORATORS)
+        add_node_features(n, features)
 
-        elif (
-            n.type in {syms.typedargslist, syms.arglist}
-            and n.children
-            and n.children[-1].type == token.COMMA
-        ):
-            if n.type == syms.typedargslist:
-                feature = Feature.TRAILING_COMMA_IN_DEF
-            else:
-                feature = Feature.TRAILING_COMMA_IN_CALL
-
-            for ch in n.children:
-                if ch.type in STARS:
-                    features.add(feature)
-
-                if ch.type == syms.argument:
-                    for argch in ch.children:
-                        if argch.type in STARS:
-                            features.add(feature)
-
-        elif (
-            n.type in {syms.return_stmt, syms.yield_expr}
-            and len(n.children) >= 2
-            and n.children[1].type == syms.testlist_star_expr
-            and any(child.type == syms.star_expr for child in n.children[1].children)
-        ):
-            features.add(Feature.UNPACKING_ON_FLOW)
+    return features
 
-        elif (
-            n.type == syms.annassign
-            and len(n.children) >= 4
-            and n.children[3].type == syms.testlist_star_expr
-        ):
-            features.add(Feature.ANN_ASSIGN_EXTENDED_RHS)
 
-        elif (
-            n.type == syms.except_clause
-            and len(n.children) >= 2
-            and n.children[1].type == token.STAR
-        ):
-            features.add(Feature.EXCEPT_STAR)
+def get_future_features(future_imports: Set[str]) -> Set[Feature]:
+    """Return the features enabled by `future_imports`."""
+    return {
+        FUTURE_FLAG_TO_FEATURE[future_import]
+        for future_import in future_imports
+        if future_import in FUTURE_FLAG_TO_FEATURE
+    }
 
-        elif n.type in {syms.subscriptlist, syms.trailer} and any(
-            child.type == syms.star_expr for child in n.children
-        ):
-            features.add(Feature.VARIADIC_GENERICS)
 
-        elif (
-            n.type == syms.tname_star
-            and len(n.children) == 3
-            and n.children[2].type == syms.star_expr
-        ):
-            features.add(Feature.VARIADIC_GENERICS)
+def add_node_features(n: LN, features: Set[Feature]) -> None:  # noqa: C901
+    """Add the features that :func:`get_features_used` looks for to `features`, if
+    `n` itself uses them (its children are checked separately)."""
+    if is_string_token(n):
+        value_head = n.value[:2]
+        if value_head in {'f"', 'F"', "f'", "F'", "rf", "fr", "RF", "FR"}:
+            features.add(Feature.F_STRINGS)
+
+    elif n.type == token.NUMBER:
+        assert isinstance(n, Leaf)
+        if "_" in n.value:
+            features.add(Feature.NUMERIC_UNDERSCORES)
+
+    elif n.type == token.SLASH:
+        if n.parent and n.parent.type in {
+            syms.typedargslist,
+            syms.arglist,
+            syms.varargslist,
+        }:
+            features.add(Feature.POS_ONLY_ARGUMENTS)
+
+    elif n.type == token.COLONEQUAL:
+        features.add(Feature.ASSIGNMENT_EXPRESSIONS)
+
+    elif n.type == syms.decorator:
+        if len(n.children) > 1 and not is_simple_decorator_expression(n.children[1]):
+            features.add(Feature.RELAXED_DECORATORS)
+
+    elif (
+        n.type in {syms.typedargslist, syms.arglist}
+        and n.children
+        and n.children[-1].type == token.COMMA
+    ):
+        if n.type == syms.typedargslist:
+            feature = Feature.TRAILING_COMMA_IN_DEF
+        else:
+            feature = Feature.TRAILING_COMMA_IN_CALL
+
+        for ch in n.children:
+            if ch.type in STARS:
+                features.add(feature)
+
+            if ch.type == syms.argument:
+                for argch in ch.children:
+                    if argch.type in STARS:
+                        features.add(feature)
+
+    elif (
+        n.type in {syms.return_stmt, syms.yield_expr}
+        and len(n.children) >= 2
+        and n.children[1].type == syms.testlist_star_expr
+        and any(child.type == syms.star_expr for child in n.children[1].children)
+    ):
+        features.add(Feature.UNPACKING_ON_FLOW)
 
-    return features
+    elif (
+        n.type == syms.annassign
+        and len(n.children) >= 4
+        and n.children[3].type == syms.testlist_star_expr
+    ):
+        features.add(Feature.ANN_ASSIGN_EXTENDED_RHS)
+
+    elif (
+        n.type == syms.except_clause
+        and len(n.children) >= 2
+        and n.children[1].type == token.STAR
+    ):
+        features.add(Feature.EXCEPT_STAR)
+
+    elif n.type in {syms.subscriptlist, syms.trailer} and any(
+        child.type == syms.star_expr for child in n.children
+    ):
+        features.add(Feature.VARIADIC_GENERICS)
+
+    elif (
+        n.type == syms.tname_star
+        and len(n.children) == 3
+        and n.children[2].type == syms.star_expr
+    ):
+        features.add(Feature.VARIADIC_GENERICS)
 
 
 def detect_target_versions(
@@ -1328,6 +1900,11 @@ def detect_target_versions(
 ) -> Set[TargetVersion]:
     """Detect the version to target based on the nodes used."""
     features = get_features_used(node, future_imports=future_imports)
+    return versions_supporting(features)
+
+
+def versions_supporting(features: Set[Feature]) -> Set[TargetVersion]:
+    """Return the target versions that support all of `features`."""
     return {
         version for version in TargetVersion if features <= VERSION_TO_FEATURES[version]
     }
@@ -1405,9 +1982,16 @@ def assert_equivalent(src: str, dst: str) -> None:
             f"This invalid output might be helpful: {log}"
         ) from None
 
-    src_ast_str = "\n".join(stringify_ast(src_ast))
-    dst_ast_str = "\n".join(stringify_ast(dst_ast))
-    if src_ast_str != dst_ast_str:
+    # Compare the ASTs line by line, so that big files don't need to be turned
+    # into big strings unless they differ.
+    if any(
+        src_line != dst_line
+        for src_line, dst_line in zip_longest(
+            stringify_ast(src_ast), stringify_ast(dst_ast)
+        )
+    ):
+        src_ast_str = "\n".join(stringify_ast(src_ast))
+        dst_ast_str = "\n".join(stringify_ast(dst_ast))
         log = dump_to_file(diff(src_ast_str, dst_ast_str, "src", "dst"))
         raise AssertionError(
             "INTERNAL ERROR: Black produced code that is not equivalent to the source."
@@ -1480,6 +2064,8 @@ def patch_click() -> None:
 
 
 def patched_main() -> None:
+    from multiprocessing import freeze_support
+
     maybe_install_uvloop()
     freeze_support()
     patch_click()
@@ -1,10 +1,28 @@
 """Caching of formatted files with feature-based invalidation."""
 
+from abc import ABC, abstractmethod
+from contextlib import closing
+from dataclasses import dataclass
+import hashlib
+from itertools import islice
 import os
 import pickle
 from pathlib import Path
 import tempfile
-from typing import Dict, Iterable, Set, Tuple
+import time
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
 
 from platformdirs import user_cache_dir
 
@@ -12,12 +30,18 @@ from blackish.mode import Mode
 
 from _blackish_version import version as __version__
 
+if TYPE_CHECKING:
+    import sqlite3
+
 
 # types
 Timestamp = float
 FileSize = int
-CacheInfo = Tuple[Timestamp, FileSize]
-Cache = Dict[str, CacheInfo]
+FileHash = str
+CacheInfo = Tuple[Timestamp, FileSize, FileHash]
+# Entries written by versions that didn't record a content digest.
+LegacyCacheInfo = Tuple[Timestamp, FileSize]
+Cache = Dict[str, Union[CacheInfo, LegacyCacheInfo]]
 
 
 def get_cache_dir() -> Path:
@@ -39,61 +63,706 @@ def get_cache_dir() -> Path:
 CACHE_DIR = get_cache_dir()
 
 
-def read_cache(mode: Mode) -> Cache:
-    """Read the cache if it exists and is well formed.
+def get_shared_cache_dir() -> Optional[Path]:
+    """Get the read-only cache directory shared by a team, if any.
 
-    If it is not well formed, the call to write_cache later should resolve the issue.
+    Users can set it using the `BLACK_SHARED_CACHE_DIR` environment variable. Unlike
+    the per-user cache, it only records digests of well formatted file contents, so
+    it can be shared between machines and checkouts (e.g. on a network mount).
+
+    This result is immediately set to a constant `blackish.cache.SHARED_CACHE_DIR` as
+    to avoid repeated calls.
     """
-    cache_file = get_cache_file(mode)
-    if not cache_file.exists():
-        return {}
+    shared_cache_dir = os.environ.get("BLACK_SHARED_CACHE_DIR")
+    if not shared_cache_dir:
+        return None
 
-    with cache_file.open("rb") as fobj:
-        try:
-            cache: Cache = pickle.load(fobj)
-        except (pickle.UnpicklingError, ValueError, IndexError):
-            return {}
+    return Path(shared_cache_dir) / __version__
+
+
+SHARED_CACHE_DIR = get_shared_cache_dir()
+# Caches keep at most this many entries, dropping the least recently used ones first.
+MAX_CACHE_ENTRIES = 100_000
+# `prune_cache` removes caches of modes that haven't been used for this many seconds.
+MAX_CACHE_AGE = 30 * 24 * 60 * 60
+
+
+@dataclass(frozen=True)
+class SourceInfo:
+    """The resolved path of a source and, if still current, its status.
+
+    File discovery collects these so that the cache doesn't need to query the
+    filesystem for them again.
+    """
+
+    path: Path
+    stat: Optional[os.stat_result] = None
+
+
+SourceInfos = Mapping[Path, SourceInfo]
+
+
+def get_source_info(src: Path, infos: Optional[SourceInfos] = None) -> SourceInfo:
+    """Return what's known about `src` from `infos`, resolving it if it's missing."""
+    info = infos.get(src) if infos is not None else None
+    if info is None:
+        info = SourceInfo(src.resolve())
+    return info
 
-    return cache
+
+def read_cache(
+    mode: Mode,
+    paths: Optional[Iterable[Path]] = None,
+    infos: Optional[SourceInfos] = None,
+) -> Cache:
+    """Read the cache if it exists and is well formed.
+
+    If `paths` is given, the returned cache may be limited to entries for those paths.
+
+    If it is not well formed, the call to write_cache later should resolve the issue.
+    """
+    keys = None
+    if paths is not None:
+        # Lazily, since not every store needs them.
+        keys = (str(get_source_info(path, infos).path) for path in paths)
+    return CACHE_STORE.read(mode, keys)
 
 
 def get_cache_file(mode: Mode) -> Path:
     return CACHE_DIR / f"cache.{mode.get_cache_key()}.pickle"
 
 
-def get_cache_info(path: Path) -> CacheInfo:
-    """Return the information used to check if a file is already formatted or not."""
-    stat = path.stat()
-    return stat.st_mtime, stat.st_size
+def get_cache_db() -> Path:
+    return CACHE_DIR / "cache.sqlite3"
+
+
+def get_shared_cache_file(mode: Mode) -> Optional[Path]:
+    if SHARED_CACHE_DIR is None:
+        return None
+
+    return SHARED_CACHE_DIR / f"shared.{mode.get_cache_key()}.txt"
+
+
+def get_shared_key(path: Path, file_hash: FileHash) -> str:
+    """Return the key identifying the contents of `path` in the shared cache."""
+    # Stubs and notebooks are formatted differently than other files with the same
+    # contents, see `format_file_in_place`.
+    if path.suffix in (".pyi", ".ipynb"):
+        return f"{file_hash}{path.suffix}"
 
+    return file_hash
 
-def filter_cached(cache: Cache, sources: Iterable[Path]) -> Tuple[Set[Path], Set[Path]]:
+
+def get_file_hash(path: Path) -> FileHash:
+    """Return a digest of the contents of the file under `path`."""
+    with path.open("rb") as fobj:
+        return hashlib.sha256(fobj.read()).hexdigest()
+
+
+def get_cache_info(path: Path, stat: Optional[os.stat_result] = None) -> CacheInfo:
+    """Return the information used to check if a file is already formatted or not.
+
+    `stat` is the status of the file under `path`, if already known.
+    """
+    if stat is None:
+        stat = path.stat()
+    return stat.st_mtime, stat.st_size, get_file_hash(path)
+
+
+def is_changed(
+    path: Path,
+    info: Optional[Union[CacheInfo, LegacyCacheInfo]],
+    stat: Optional[os.stat_result] = None,
+) -> bool:
+    """Check if the file under `path` changed since `info` was recorded.
+
+    The modification time and size are compared first. Only if they differ but the
+    size still matches is the content digest computed, so that files which merely
+    got a new modification time (e.g. after a fresh checkout) are still considered
+    unchanged. `stat` is the status of the file under `path`, if already known.
+    """
+    if info is None:
+        return True
+
+    if stat is None:
+        stat = path.stat()
+    if (stat.st_mtime, stat.st_size) == info[:2]:
+        return False
+
+    if len(info) < 3 or stat.st_size != info[1]:
+        return True
+
+    return get_file_hash(path) != cast(CacheInfo, info)[2]
+
+
+def filter_cached(
+    cache: Mapping[str, Union[CacheInfo, LegacyCacheInfo]],
+    sources: Iterable[Path],
+    infos: Optional[SourceInfos] = None,
+) -> Tuple[Set[Path], Set[Path]]:
     """Split an iterable of paths in `sources` into two sets.
 
     The first contains paths of files that modified on disk or are not in the
     cache. The other contains paths to non-modified files.
+
+    `infos` holds what file discovery already knows about `sources`.
     """
     todo, done = set(), set()
     for src in sources:
-        res_src = src.resolve()
-        if cache.get(str(res_src)) != get_cache_info(res_src):
+        info = get_source_info(src, infos)
+        if is_changed(info.path, cache.get(str(info.path)), info.stat):
             todo.add(src)
         else:
             done.add(src)
     return todo, done
 
 
-def write_cache(cache: Cache, sources: Iterable[Path], mode: Mode) -> None:
-    """Update the cache file."""
-    cache_file = get_cache_file(mode)
+def read_shared_cache(mode: Mode) -> Set[str]:
+    """Read the keys of well formatted contents from the shared cache, if any."""
+    shared_cache_file = get_shared_cache_file(mode)
+    if shared_cache_file is None:
+        return set()
+
+    try:
+        with shared_cache_file.open("r", encoding="ascii") as fobj:
+            return {line.strip() for line in fobj}
+    except (OSError, ValueError):
+        return set()
+
+
+def filter_shared(sources: Iterable[Path], mode: Mode) -> Tuple[Set[Path], Set[Path]]:
+    """Split an iterable of paths in `sources` into two sets.
+
+    The first contains paths of files whose contents aren't known to be well
+    formatted by the shared cache. The other contains paths to files that are.
+    """
+    todo = set(sources)
+    if not todo or SHARED_CACHE_DIR is None:
+        return todo, set()
+
+    shared_cache = read_shared_cache(mode)
+    if not shared_cache:
+        return todo, set()
+
+    done = set()
+    for src in todo:
+        try:
+            file_hash = get_file_hash(src)
+        except OSError:
+            continue
+        if get_shared_key(src, file_hash) in shared_cache:
+            done.add(src)
+    return todo - done, done
+
+
+def export_cache(mode: Mode) -> int:
+    """Add the contents of the files in the cache for `mode` to the shared cache.
+
+    Return the number of entries in the shared cache afterwards.
+    """
+    shared_cache_file = get_shared_cache_file(mode)
+    assert shared_cache_file is not None, "the shared cache directory is not set"
+    shared_cache = read_shared_cache(mode)
+    for path, info in read_cache(mode).items():
+        if len(info) == 3:
+            shared_cache.add(get_shared_key(Path(path), cast(CacheInfo, info)[2]))
+    shared_cache_file.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="ascii", dir=str(shared_cache_file.parent), delete=False
+    ) as f:
+        f.writelines(f"{key}\n" for key in sorted(shared_cache))
+    # Temporary files are only readable by their owner, but this one is shared.
+    os.chmod(f.name, 0o644)
+    os.replace(f.name, shared_cache_file)
+    return len(shared_cache)
+
+
+def write_cache(
+    cache: Cache,
+    sources: Iterable[Path],
+    mode: Mode,
+    infos: Optional[SourceInfos] = None,
+) -> None:
+    """Update the cache file.
+
+    `infos` holds what file discovery already knows about `sources`. The status
+    of files that were written to since must have been dropped from it.
+    """
     try:
         CACHE_DIR.mkdir(parents=True, exist_ok=True)
-        new_cache = {
-            **cache,
-            **{str(src.resolve()): get_cache_info(src) for src in sources},
-        }
-        with tempfile.NamedTemporaryFile(dir=str(cache_file.parent), delete=False) as f:
-            pickle.dump(new_cache, f, protocol=4)
-        os.replace(f.name, cache_file)
+        entries: Cache = {}
+        for src in sources:
+            info = get_source_info(src, infos)
+            entries[str(info.path)] = get_cache_info(info.path, info.stat)
+        CACHE_STORE.write(mode, cache, entries)
     except OSError:
         pass
+
+
+def touch_cache(
+    cache: Cache,
+    sources: Iterable[Path],
+    mode: Mode,
+    infos: Optional[SourceInfos] = None,
+) -> None:
+    """Record that the cache entries of `sources` were just used.
+
+    Entries that weren't used for the longest time are the first to be evicted.
+    `sources` must have been found unchanged by `filter_cached`. Those that only
+    got a new modification time (e.g. from a fresh checkout) get it in their entry
+    too, so that they aren't hashed again by the next run.
+    """
+    try:
+        paths = []
+        entries: Cache = {}
+        for src in sources:
+            info = get_source_info(src, infos)
+            path = str(info.path)
+            paths.append(path)
+            entry = cache.get(path)
+            if entry is None or len(entry) < 3:
+                continue
+
+            stat = info.stat if info.stat is not None else info.path.stat()
+            if (stat.st_mtime, stat.st_size) != entry[:2]:
+                file_hash = cast(CacheInfo, entry)[2]
+                entries[path] = (stat.st_mtime, stat.st_size, file_hash)
+        CACHE_STORE.touch(mode, cache, paths)
+        if entries:
+            CACHE_STORE.write(mode, cache, entries)
+            cache.update(entries)
+    except OSError:
+        pass
+
+
+def get_cache_stats() -> List["CacheStats"]:
+    """Return statistics about the caches of all modes."""
+    try:
+        return CACHE_STORE.stats()
+    except OSError:
+        return []
+
+
+def prune_cache(max_entries: int = MAX_CACHE_ENTRIES) -> List["CacheStats"]:
+    """Drop entries of files that no longer exist and the least recently used entries
+    beyond `max_entries`, and remove the caches of modes that weren't used recently.
+
+    Return statistics about what was removed from the caches of every mode.
+    """
+    try:
+        return CACHE_STORE.prune(max_entries)
+    except OSError:
+        return []
+
+
+@dataclass
+class CacheStats:
+    """Statistics about the cache of a single mode."""
+
+    key: str
+    entries: int
+    size: Optional[int] = None
+    # Entries of files that no longer exist.
+    missing: int = 0
+    # Least recently used entries dropped to stay within the maximum number of entries.
+    evicted: int = 0
+    # Whether the whole cache was removed because it hadn't been used recently.
+    expired: bool = False
+
+    @property
+    def removed(self) -> int:
+        return self.missing + self.evicted
+
+
+class CacheStore(ABC):
+    """Storage backend for the per-mode caches."""
+
+    @abstractmethod
+    def read(self, mode: Mode, paths: Optional[Iterable[str]] = None) -> Cache:
+        """Return the cache for `mode`, possibly limited to entries for `paths`.
+
+        `paths` are resolved paths, like the keys of the cache.
+        """
+
+    @abstractmethod
+    def write(self, mode: Mode, cache: Cache, entries: Cache) -> None:
+        """Store `entries` in the cache for `mode`.
+
+        `cache` is what `read` returned earlier. Stores that can't update entries
+        in place rewrite it together with `entries`.
+        """
+
+    @abstractmethod
+    def touch(self, mode: Mode, cache: Cache, paths: Iterable[str]) -> None:
+        """Mark the entries for `paths` as used."""
+
+    @abstractmethod
+    def stats(self) -> List[CacheStats]:
+        """Return statistics about the caches of all modes."""
+
+    @abstractmethod
+    def prune(self, max_entries: int) -> List[CacheStats]:
+        """Remove stale entries and caches, see `prune_cache`."""
+
+
+class PickleCacheStore(CacheStore):
+    """One pickled dictionary per mode, rewritten as a whole on every update.
+
+    The dictionaries are kept in least recently used order. Uses of entries are
+    recorded in memory and saved along with the next write, or by rewriting the
+    file if it wasn't written for `TOUCH_RESOLUTION` seconds. The modification time
+    of the file tells when the cache was last used, to that resolution.
+    """
+
+    # Runs over unchanged files only rewrite the file once in this many seconds.
+    TOUCH_RESOLUTION = 60 * 60
+
+    def read(self, mode: Mode, paths: Optional[Iterable[str]] = None) -> Cache:
+        cache_file = get_cache_file(mode)
+        if not cache_file.exists():
+            return {}
+
+        return self._load(cache_file)
+
+    def write(self, mode: Mode, cache: Cache, entries: Cache) -> None:
+        new_cache = {path: info for path, info in cache.items() if path not in entries}
+        new_cache.update(entries)
+        if len(new_cache) > MAX_CACHE_ENTRIES:
+            new_cache = self._evict(new_cache, MAX_CACHE_ENTRIES)
+        self._dump(get_cache_file(mode), new_cache)
+
+    def touch(self, mode: Mode, cache: Cache, paths: Iterable[str]) -> None:
+        used = {path: None for path in paths if path in cache}
+        if not used:
+            return
+
+        for path in used:
+            cache[path] = cache.pop(path)
+        cache_file = get_cache_file(mode)
+        if cache_file.stat().st_mtime < time.time() - self.TOUCH_RESOLUTION:
+            # This also tells `prune` when the cache was last used.
+            self._dump(cache_file, cache)
+
+    def stats(self) -> List[CacheStats]:
+        return [
+            CacheStats(
+                key=self._get_key(cache_file),
+                entries=len(self._load(cache_file)),
+                size=cache_file.stat().st_size,
+            )
+            for cache_file in self._get_cache_files()
+        ]
+
+    def prune(self, max_entries: int) -> List[CacheStats]:
+        results = []
+        for cache_file in self._get_cache_files():
+            cache = self._load(cache_file)
+            stats = CacheStats(key=self._get_key(cache_file), entries=len(cache))
+            if cache_file.stat().st_mtime < time.time() - MAX_CACHE_AGE:
+                cache_file.unlink()
+                stats.expired = True
+                results.append(stats)
+                continue
+
+            new_cache = {
+                path: info for path, info in cache.items() if Path(path).exists()
+            }
+            stats.missing = len(cache) - len(new_cache)
+            if len(new_cache) > max_entries:
+                new_cache = self._evict(new_cache, max_entries)
+            stats.evicted = len(cache) - stats.missing - len(new_cache)
+            stats.entries = len(new_cache)
+            if stats.removed:
+                self._dump(cache_file, new_cache)
+            stats.size = cache_file.stat().st_size
+            results.append(stats)
+        return results
+
+    def _evict(self, cache: Cache, max_entries: int) -> Cache:
+        return dict(islice(cache.items(), len(cache) - max_entries, None))
+
+    def _get_cache_files(self) -> List[Path]:
+        if not CACHE_DIR.is_dir():
+            return []
+
+        return sorted(CACHE_DIR.glob("cache.*.pickle"))
+
+    def _get_key(self, cache_file: Path) -> str:
+        return cache_file.name[len("cache.") : -len(".pickle")]
+
+    def _load(self, cache_file: Path) -> Cache:
+        with cache_file.open("rb") as fobj:
+            try:
+                cache: Cache = pickle.load(fobj)
+            except (pickle.UnpicklingError, ValueError, IndexError):
+                return {}
+
+        return cache
+
+    def _dump(self, cache_file: Path, cache: Cache) -> None:
+        with tempfile.NamedTemporaryFile(dir=str(cache_file.parent), delete=False) as f:
+            pickle.dump(cache, f, protocol=4)
+        os.replace(f.name, cache_file)
+
+
+class SqliteCacheStore(CacheStore):
+    """A single SQLite database holding the caches of all modes.
+
+    Only the rows for the requested paths are read and only the touched rows are
+    written. The database runs in WAL mode so that concurrent processes can read
+    while another one writes, and writers wait for each other instead of dropping
+    entries.
+    """
+
+    SCHEMA_VERSION = 2
+    # Stay well below SQLITE_MAX_VARIABLE_NUMBER, which is 999 on older versions.
+    MAX_PARAMS = 500
+    TIMEOUT = 30.0
+    # Uses of entries are only recorded if the previous one is older than this many
+    # seconds, so that runs over unchanged files rarely need to write.
+    TOUCH_RESOLUTION = 60 * 60
+
+    def read(self, mode: Mode, paths: Optional[Iterable[str]] = None) -> Cache:
+        import sqlite3
+
+        if not get_cache_db().exists():
+            return {}
+
+        key = mode.get_cache_key()
+        query = "SELECT path, mtime, size, hash FROM entries WHERE mode = ?"
+        cache: Cache = {}
+        try:
+            with closing(self._connect()) as conn:
+                if not self._has_schema(conn):
+                    return {}
+
+                if paths is None:
+                    rows = conn.execute(query, (key,)).fetchall()
+                else:
+                    rows = []
+                    for chunk in self._chunks(list(paths)):
+                        marks = ", ".join("?" * len(chunk))
+                        rows.extend(
+                            conn.execute(
+                                f"{query} AND path IN ({marks})", (key, *chunk)
+                            ).fetchall()
+                        )
+        except sqlite3.Error:
+            return {}
+
+        for path, mtime, size, file_hash in rows:
+            cache[path] = (mtime, size, file_hash)
+        return cache
+
+    def write(self, mode: Mode, cache: Cache, entries: Cache) -> None:
+        import sqlite3
+
+        key = mode.get_cache_key()
+        now = time.time()
+        rows = [
+            (key, path, info[0], info[1], cast(CacheInfo, info)[2], now)
+            for path, info in entries.items()
+        ]
+        try:
+            with closing(self._connect(create=True)) as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany(
+                    "INSERT OR REPLACE INTO entries"
+                    " (mode, path, mtime, size, hash, last_hit)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                # Replacing the entries read into `cache` doesn't add any rows.
+                if any(path not in cache for path in entries):
+                    (count,) = conn.execute(
+                        "SELECT COUNT(*) FROM entries WHERE mode = ?", (key,)
+                    ).fetchone()
+                    if count > MAX_CACHE_ENTRIES:
+                        self._evict(conn, key, MAX_CACHE_ENTRIES)
+                conn.execute("COMMIT")
+        except sqlite3.Error:
+            pass
+
+    def touch(self, mode: Mode, cache: Cache, paths: Iterable[str]) -> None:
+        import sqlite3
+
+        if not get_cache_db().exists():
+            return
+
+        key = mode.get_cache_key()
+        now = time.time()
+        try:
+            with closing(self._connect()) as conn:
+                if not self._has_schema(conn):
+                    return
+
+                conn.execute("BEGIN IMMEDIATE")
+                for chunk in self._chunks(list(paths)):
+                    marks = ", ".join("?" * len(chunk))
+                    conn.execute(
+                        "UPDATE entries SET last_hit = ?"
+                        f" WHERE mode = ? AND last_hit < ? AND path IN ({marks})",
+                        (now, key, now - self.TOUCH_RESOLUTION, *chunk),
+                    )
+                conn.execute("COMMIT")
+        except sqlite3.Error:
+            pass
+
+    def stats(self) -> List[CacheStats]:
+        import sqlite3
+
+        if not get_cache_db().exists():
+            return []
+
+        try:
+            with closing(self._connect()) as conn:
+                if not self._has_schema(conn):
+                    return []
+
+                rows = conn.execute(
+                    "SELECT mode, COUNT(*) FROM entries GROUP BY mode ORDER BY mode"
+                ).fetchall()
+        except sqlite3.Error:
+            return []
+
+        return [CacheStats(key=key, entries=count) for key, count in rows]
+
+    def prune(self, max_entries: int) -> List[CacheStats]:
+        import sqlite3
+
+        if not get_cache_db().exists():
+            return []
+
+        results = []
+        try:
+            with closing(self._connect()) as conn:
+                if not self._has_schema(conn):
+                    return []
+
+                conn.execute("BEGIN IMMEDIATE")
+                modes = conn.execute(
+                    "SELECT mode, COUNT(*), MAX(last_hit) FROM entries"
+                    " GROUP BY mode ORDER BY mode"
+                ).fetchall()
+                for key, count, last_hit in modes:
+                    stats = CacheStats(key=key, entries=count)
+                    results.append(stats)
+                    if last_hit < time.time() - MAX_CACHE_AGE:
+                        conn.execute("DELETE FROM entries WHERE mode = ?", (key,))
+                        stats.expired = True
+                        continue
+
+                    missing = [
+                        path
+                        for (path,) in conn.execute(
+                            "SELECT path FROM entries WHERE mode = ?", (key,)
+                        )
+                        if not os.path.exists(path)
+                    ]
+                    for chunk in self._chunks(missing):
+                        marks = ", ".join("?" * len(chunk))
+                        conn.execute(
+                            f"DELETE FROM entries WHERE mode = ? AND path IN ({marks})",
+                            (key, *chunk),
+                        )
+                    stats.missing = len(missing)
+                    if count - stats.missing > max_entries:
+                        stats.evicted = self._evict(conn, key, max_entries)
+                    stats.entries = count - stats.removed
+                conn.execute("COMMIT")
+                conn.execute("VACUUM")
+        except sqlite3.Error:
+            return []
+
+        return results
+
+    def _evict(self, conn: "sqlite3.Connection", key: str, max_entries: int) -> int:
+        cursor = conn.execute(
+            "DELETE FROM entries WHERE mode = ? AND path NOT IN"
+            " (SELECT path FROM entries WHERE mode = ?"
+            " ORDER BY last_hit DESC LIMIT ?)",
+            (key, key, max_entries),
+        )
+        return int(cursor.rowcount)
+
+    def _chunks(self, items: List[str]) -> Iterable[List[str]]:
+        for i in range(0, len(items), self.MAX_PARAMS):
+            yield items[i : i + self.MAX_PARAMS]
+
+    def _connect(self, create: bool = False) -> "sqlite3.Connection":
+        """Connect to the database, creating its schema if `create` is True.
+
+        Otherwise, the caller must check that the schema is there with `_has_schema`.
+        That way, only writing entries changes the database.
+        """
+        import sqlite3
+
+        # Transactions are managed explicitly, see `write`.
+        conn = sqlite3.connect(
+            str(get_cache_db()), timeout=self.TIMEOUT, isolation_level=None
+        )
+        try:
+            if create and not self._has_schema(conn):
+                self._create_schema(conn)
+        except BaseException:
+            conn.close()
+            raise
+
+        return conn
+
+    def _has_schema(self, conn: "sqlite3.Connection") -> bool:
+        return self._get_schema_version(conn) == self.SCHEMA_VERSION
+
+    def _get_schema_version(self, conn: "sqlite3.Connection") -> int:
+        (version,) = conn.execute("PRAGMA user_version").fetchone()
+        return int(version)
+
+    def _create_schema(self, conn: "sqlite3.Connection") -> None:
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("BEGIN IMMEDIATE")
+        # Another process might have won the race to create the schema.
+        if not self._has_schema(conn):
+            # The cache is disposable, so outdated schemas are simply dropped.
+            conn.execute("DROP TABLE IF EXISTS entries")
+            conn.execute(
+                "CREATE TABLE entries ("
+                " mode TEXT NOT NULL,"
+                " path TEXT NOT NULL,"
+                " mtime REAL NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " hash TEXT NOT NULL,"
+                " last_hit REAL NOT NULL,"
+                " PRIMARY KEY (mode, path)"
+                ")"
+            )
+            conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        conn.execute("COMMIT")
+
+
+CACHE_STORES: Dict[str, Type[CacheStore]] = {
+    "pickle": PickleCacheStore,
+    "sqlite": SqliteCacheStore,
+}
+
+
+def get_cache_store() -> CacheStore:
+    """Get the cache storage backend used by blackish.
+
+    Users can select it using the `BLACK_CACHE_BACKEND` environment variable, which
+    can be either "pickle" (the default) or "sqlite". The SQLite backend is only
+    available if Python was built with the `sqlite3` module.
+
+    This result is immediately set to a constant `blackish.cache.CACHE_STORE` as to
+    avoid repeated calls.
+    """
+    name = os.environ.get("BLACK_CACHE_BACKEND", "pickle").lower()
+    store_class = CACHE_STORES.get(name, PickleCacheStore)
+    if store_class is SqliteCacheStore:
+        try:
+            import sqlite3  # noqa: F401
+        except ImportError:
+            store_class = PickleCacheStore
+    return store_class()
+
+
+CACHE_STORE = get_cache_store()
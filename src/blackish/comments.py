@@ -1,4 +1,5 @@
 import sys
+from collections import deque
 from dataclasses import dataclass
 from functools import lru_cache
 import re
@@ -134,11 +135,53 @@ def make_comment(content: str, *, preview: bool) -> str:
     return "#" + content
 
 
-def normalize_fmt_off(node: Node, *, preview: bool) -> None:
-    """Convert content between `# fmt: off`/`# fmt: on` into standalone comments."""
-    try_again = True
-    while try_again:
-        try_again = convert_one_fmt_off_pair(node, preview=preview)
+def normalize_fmt_off(
+    node: Node, *, preview: bool, leaves: Optional[List[Leaf]] = None
+) -> None:
+    """Convert content between `# fmt: off`/`# fmt: on` into standalone comments.
+
+    `leaves` are the leaves of `node` for which :func:`has_fmt_pass_comment` is
+    true, if they're already known.
+    """
+    if leaves is None:
+        leaves = [
+            leaf
+            for leaf in node.leaves()
+            if has_fmt_pass_comment(leaf, preview=preview)
+        ]
+    # All pairs are converted in one pass over the leaves: a conversion only changes
+    # the tree from its leaf on, so the leaves before it needn't be looked at again.
+    pending = deque(leaves)
+    while pending:
+        leaf = pending.popleft()
+        if not is_in_tree(leaf, node) or not has_fmt_pass_comment(
+            leaf, preview=preview
+        ):
+            # It was hidden in a standalone comment, or its comment was dropped.
+            continue
+
+        standalone_comment = convert_fmt_off_pair(leaf, preview=preview)
+        if standalone_comment is not None:
+            # The standalone comment took the place of the hidden nodes, and keeps
+            # the comments before the `# fmt: off` in its prefix.
+            pending.appendleft(leaf)
+            pending.appendleft(standalone_comment)
+
+
+def has_fmt_pass_comment(leaf: Leaf, *, preview: bool) -> bool:
+    """Is there a `# fmt: off` or `# fmt: skip` comment in the prefix of `leaf`?"""
+    return "#" in leaf.prefix and any(
+        comment.value in FMT_PASS
+        for comment in list_comments(leaf.prefix, is_endmarker=False, preview=preview)
+    )
+
+
+def is_in_tree(leaf: Leaf, root: Node) -> bool:
+    """Is `leaf` still part of the tree under `root`?"""
+    node: LN = leaf
+    while node.parent is not None:
+        node = node.parent
+    return node is root
 
 
 def convert_one_fmt_off_pair(node: Node, *, preview: bool) -> bool:
@@ -147,62 +190,72 @@ def convert_one_fmt_off_pair(node: Node, *, preview: bool) -> bool:
     Returns True if a pair was converted.
     """
     for leaf in node.leaves():
-        previous_consumed = 0
-        for comment in list_comments(leaf.prefix, is_endmarker=False, preview=preview):
-            if comment.value not in FMT_PASS:
-                previous_consumed = comment.consumed
-                continue
-            # We only want standalone comments. If there's no previous leaf or
-            # the previous leaf is indentation, it's a standalone comment in
-            # disguise.
-            if comment.value in FMT_PASS and comment.type != STANDALONE_COMMENT:
-                prev = preceding_leaf(leaf)
-                if prev:
-                    if comment.value in FMT_OFF and prev.type not in WHITESPACE:
-                        continue
-                    if comment.value in FMT_SKIP and prev.type in WHITESPACE:
-                        continue
-
-            ignored_nodes = list(generate_ignored_nodes(leaf, comment, preview=preview))
-            if not ignored_nodes:
-                continue
-
-            first = ignored_nodes[0]  # Can be a container node with the `leaf`.
-            parent = first.parent
-            prefix = first.prefix
-            if comment.value in FMT_OFF:
-                first.prefix = prefix[comment.consumed :]
-            if comment.value in FMT_SKIP:
-                first.prefix = ""
-            hidden_value = "".join(str(n) for n in ignored_nodes)
-            if comment.value in FMT_OFF:
-                hidden_value = comment.value + "\n" + hidden_value
-            if comment.value in FMT_SKIP:
-                hidden_value += "  " + comment.value
-            if hidden_value.endswith("\n"):
-                # That happens when one of the `ignored_nodes` ended with a NEWLINE
-                # leaf (possibly followed by a DEDENT).
-                hidden_value = hidden_value[:-1]
-            first_idx: Optional[int] = None
-            for ignored in ignored_nodes:
-                index = ignored.remove()
-                if first_idx is None:
-                    first_idx = index
-            assert parent is not None, "INTERNAL ERROR: fmt: on/off handling (1)"
-            assert first_idx is not None, "INTERNAL ERROR: fmt: on/off handling (2)"
-            parent.insert_child(
-                first_idx,
-                Leaf(
-                    STANDALONE_COMMENT,
-                    hidden_value,
-                    prefix=prefix[:previous_consumed] + "\n" * comment.newlines,
-                ),
-            )
+        if convert_fmt_off_pair(leaf, preview=preview) is not None:
             return True
 
     return False
 
 
+def convert_fmt_off_pair(leaf: Leaf, *, preview: bool) -> Optional[Leaf]:
+    """Convert the content of the first `# fmt: off`/`# fmt: on` pair or `# fmt: skip`
+    in the prefix of `leaf` into a standalone comment.
+
+    Returns the standalone comment, or None if nothing was converted.
+    """
+    previous_consumed = 0
+    for comment in list_comments(leaf.prefix, is_endmarker=False, preview=preview):
+        if comment.value not in FMT_PASS:
+            previous_consumed = comment.consumed
+            continue
+        # We only want standalone comments. If there's no previous leaf or
+        # the previous leaf is indentation, it's a standalone comment in
+        # disguise.
+        if comment.value in FMT_PASS and comment.type != STANDALONE_COMMENT:
+            prev = preceding_leaf(leaf)
+            if prev:
+                if comment.value in FMT_OFF and prev.type not in WHITESPACE:
+                    continue
+                if comment.value in FMT_SKIP and prev.type in WHITESPACE:
+                    continue
+
+        ignored_nodes = list(generate_ignored_nodes(leaf, comment, preview=preview))
+        if not ignored_nodes:
+            continue
+
+        first = ignored_nodes[0]  # Can be a container node with the `leaf`.
+        parent = first.parent
+        prefix = first.prefix
+        if comment.value in FMT_OFF:
+            first.prefix = prefix[comment.consumed :]
+        if comment.value in FMT_SKIP:
+            first.prefix = ""
+        hidden_value = "".join(str(n) for n in ignored_nodes)
+        if comment.value in FMT_OFF:
+            hidden_value = comment.value + "\n" + hidden_value
+        if comment.value in FMT_SKIP:
+            hidden_value += "  " + comment.value
+        if hidden_value.endswith("\n"):
+            # That happens when one of the `ignored_nodes` ended with a NEWLINE
+            # leaf (possibly followed by a DEDENT).
+            hidden_value = hidden_value[:-1]
+        first_idx: Optional[int] = None
+        for ignored in ignored_nodes:
+            index = ignored.remove()
+            if first_idx is None:
+                first_idx = index
+        assert parent is not None, "INTERNAL ERROR: fmt: on/off handling (1)"
+        assert first_idx is not None, "INTERNAL ERROR: fmt: on/off handling (2)"
+        standalone_comment = Leaf(
+            STANDALONE_COMMENT,
+            hidden_value,
+            prefix=prefix[:previous_consumed] + "\n" * comment.newlines,
+        )
+        parent.insert_child(first_idx, standalone_comment)
+        return standalone_comment
+
+    return None
+
+
 def generate_ignored_nodes(
     leaf: Leaf, comment: ProtoComment, *, preview: bool
 ) -> Iterator[LN]:
@@ -1,10 +1,12 @@
-import asyncio
 import logging
 import sys
-from typing import Any, Iterable
+from typing import TYPE_CHECKING, Any, Iterable
 
 from blackish.output import err
 
+if TYPE_CHECKING:
+    import asyncio
+
 
 def maybe_install_uvloop() -> None:
     """If our environment has uvloop installed we use it.
@@ -28,8 +30,10 @@ def cancel(tasks: Iterable["asyncio.Task[Any]"]) -> None:
         task.cancel()
 
 
-def shutdown(loop: asyncio.AbstractEventLoop) -> None:
+def shutdown(loop: "asyncio.AbstractEventLoop") -> None:
     """Cancel all pending tasks on `loop`, wait for them, and close the loop."""
+    import asyncio
+
     try:
         if sys.version_info[:2] >= (3, 7):
             all_tasks = asyncio.all_tasks
@@ -9,6 +9,7 @@ from typing import (
     Iterable,
     Iterator,
     List,
+    Mapping,
     Optional,
     Pattern,
     Sequence,
@@ -21,18 +22,9 @@ from mypy_extensions import mypyc_attr
 from pathspec import PathSpec
 from pathspec.patterns.gitwildmatch import GitWildMatchPatternError
 
-if sys.version_info >= (3, 11):
-    try:
-        import tomllib
-    except ImportError:
-        # Help users on older alphas
-        import tomli as tomllib
-else:
-    import tomli as tomllib
-
-from blackish.output import err
+from blackish.cache import SourceInfo
+from blackish.output import err, out
 from blackish.report import Report
-from blackish.handle_ipynb_magics import jupyter_dependencies_are_installed
 
 if TYPE_CHECKING:
     import colorama  # noqa: F401
@@ -107,6 +99,15 @@ def parse_pyproject_toml(path_config: str) -> Dict[str, Any]:
 
     If parsing fails, will raise a tomllib.TOMLDecodeError
     """
+    if sys.version_info >= (3, 11):
+        try:
+            import tomllib
+        except ImportError:
+            # Help users on older alphas
+            import tomli as tomllib
+    else:
+        import tomli as tomllib
+
     with open(path_config, "rb") as f:
         pyproject_toml = tomllib.load(f)
     config = pyproject_toml.get("tool", {}).get("blackish", {})
@@ -185,6 +186,13 @@ def path_is_excluded(
     return bool(match and match.group(0))
 
 
+def scan_dir(path: Path) -> Dict[Path, "os.DirEntry[str]"]:
+    """Return the children of the directory under `path` with their directory
+    entries, which remember what kind of file they are."""
+    with os.scandir(path) as entries:
+        return {path / entry.name: entry for entry in entries}
+
+
 def gen_python_files(
     paths: Iterable[Path],
     root: Path,
@@ -197,6 +205,9 @@ def gen_python_files(
     *,
     verbose: bool,
     quiet: bool,
+    dir_entries: Optional[Mapping[Path, "os.DirEntry[str]"]] = None,
+    resolved_dir: Optional[Path] = None,
+    infos: Optional[Dict[Path, SourceInfo]] = None,
 ) -> Iterator[Path]:
     """Generate all files under `path` whose paths are not excluded by the
     `exclude_regex`, `extend_exclude`, or `force_exclude` regexes,
@@ -205,21 +216,36 @@ def gen_python_files(
     Symbolic links pointing outside of the `root` directory are ignored.
 
     `report` is where output about exclusions goes.
+
+    `dir_entries` optionally maps `paths` to their entries as returned by
+    `os.scandir` on the directory whose resolved path is `resolved_dir`. If `infos`
+    is given, the resolved path and status of every generated file is stored in it
+    so that the cache doesn't need to query them again.
     """
     assert root.is_absolute(), f"INTERNAL ERROR: `root` must be absolute but is {root}"
     for child in paths:
-        normalized_path = normalize_path_maybe_ignore(child, root, report)
-        if normalized_path is None:
-            continue
+        entry = dir_entries.get(child) if dir_entries is not None else None
+        # Only symbolic links need resolving to find where they point.
+        if entry is None or resolved_dir is None or entry.is_symlink():
+            normalized_path = normalize_path_maybe_ignore(child, root, report)
+            if normalized_path is None:
+                continue
+
+            resolved_path = root / normalized_path
+        else:
+            resolved_path = resolved_dir / entry.name
+            normalized_path = resolved_path.relative_to(root).as_posix()
 
         # First ignore files matching .gitignore, if passed
         if gitignore is not None and gitignore.match_file(normalized_path):
             report.path_ignored(child, "matches the .gitignore file content")
             continue
 
+        is_dir = entry.is_dir() if entry is not None else child.is_dir()
+
         # Then ignore with `--exclude` `--extend-exclude` and `--force-exclude` options.
         normalized_path = "/" + normalized_path
-        if child.is_dir():
+        if is_dir:
             normalized_path += "/"
 
         if path_is_excluded(normalized_path, exclude):
@@ -236,11 +262,13 @@ def gen_python_files(
             report.path_ignored(child, "matches the --force-exclude regular expression")
             continue
 
-        if child.is_dir():
+        is_file = entry.is_file() if entry is not None else child.is_file()
+        if is_dir:
             # If gitignore is None, gitignore usage is disabled, while a Falsey
             # gitignore is when the directory doesn't have a .gitignore file.
+            entries = scan_dir(child)
             yield from gen_python_files(
-                child.iterdir(),
+                entries,
                 root,
                 include,
                 exclude,
@@ -250,18 +278,44 @@ def gen_python_files(
                 gitignore + get_gitignore(child) if gitignore is not None else None,
                 verbose=verbose,
                 quiet=quiet,
+                dir_entries=entries,
+                resolved_dir=resolved_path,
+                infos=infos,
             )
 
-        elif child.is_file():
+        elif is_file:
             if child.suffix == ".ipynb" and not jupyter_dependencies_are_installed(
                 verbose=verbose, quiet=quiet
             ):
                 continue
             include_match = include.search(normalized_path) if include else True
             if include_match:
+                if infos is not None:
+                    try:
+                        stat = entry.stat() if entry is not None else child.stat()
+                    except OSError:
+                        stat = None
+                    infos[child] = SourceInfo(resolved_path, stat)
                 yield child
 
 
+@lru_cache()
+def jupyter_dependencies_are_installed(*, verbose: bool, quiet: bool) -> bool:
+    try:
+        import IPython  # noqa:F401
+        import tokenize_rt  # noqa:F401
+    except ModuleNotFoundError:
+        if verbose or not quiet:
+            msg = (
+                "Skipping .ipynb files as Jupyter dependencies are not installed.\n"
+                "You can fix this by running ``pip install blackish[jupyter]``"
+            )
+            out(msg)
+        return False
+    else:
+        return True
+
+
 def wrap_stream_for_windows(
     f: io.TextIOWrapper,
 ) -> Union[io.TextIOWrapper, "colorama.AnsiToWin32"]:
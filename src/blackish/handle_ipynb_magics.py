@@ -1,6 +1,5 @@
 """Functions to process IPython magics with."""
 
-from functools import lru_cache
 import dataclasses
 import ast
 from typing import Dict, List, Tuple, Optional
@@ -15,7 +14,11 @@ else:
     from typing_extensions import TypeGuard
 
 from blackish.report import NothingChanged
-from blackish.output import out
+
+# Re-exported, they're only defined elsewhere so that `import blackish` doesn't
+# need this module.
+from blackish.const import PYTHON_CELL_MAGICS  # noqa: F401
+from blackish.files import jupyter_dependencies_are_installed  # noqa: F401
 
 
 TRANSFORMED_MAGICS = frozenset(
@@ -37,17 +40,6 @@ TOKENS_TO_IGNORE = frozenset(
         "ESCAPED_NL",
     )
 )
-PYTHON_CELL_MAGICS = frozenset(
-    (
-        "capture",
-        "prun",
-        "pypy",
-        "python",
-        "python3",
-        "time",
-        "timeit",
-    )
-)
 TOKEN_HEX = secrets.token_hex
 
 
@@ -57,23 +49,6 @@ class Replacement:
     src: str
 
 
-@lru_cache()
-def jupyter_dependencies_are_installed(*, verbose: bool, quiet: bool) -> bool:
-    try:
-        import IPython  # noqa:F401
-        import tokenize_rt  # noqa:F401
-    except ModuleNotFoundError:
-        if verbose or not quiet:
-            msg = (
-                "Skipping .ipynb files as Jupyter dependencies are not installed.\n"
-                "You can fix this by running ``pip install blackish[jupyter]``"
-            )
-            out(msg)
-        return False
-    else:
-        return True
-
-
 def remove_trailing_semicolon(src: str) -> Tuple[str, bool]:
     """Remove trailing semicolon from Jupyter notebook cell.
 
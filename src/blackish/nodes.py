@@ -30,11 +30,10 @@ from blib2to3.pytree import Node, Leaf, type_repr, NL
 from blib2to3 import pygram
 from blib2to3.pgen2 import token
 
-from blackish.cache import CACHE_DIR
 from blackish.strings import has_triple_quotes
 
 
-pygram.initialize(CACHE_DIR)
+pygram.initialize()
 syms: Final = pygram.python_symbols
 
 
@@ -2,9 +2,13 @@
 Parse Python code and perform AST validation.
 """
 import ast
+import io
 import platform
+import re
 import sys
-from typing import Any, Iterable, Iterator, List, Set, Tuple, Type, Union
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
+from typing import Tuple, Type, Union
 
 if sys.version_info < (3, 8):
     from typing_extensions import Final
@@ -14,10 +18,10 @@ else:
 # lib2to3 fork
 from blib2to3.pytree import Node, Leaf
 from blib2to3 import pygram
-from blib2to3.pgen2 import driver
+from blib2to3.pgen2 import driver, token, tokenize
 from blib2to3.pgen2.grammar import Grammar
 from blib2to3.pgen2.parse import ParseError
-from blib2to3.pgen2.tokenize import TokenError
+from blib2to3.pgen2.tokenize import GoodTokenInfo, TokenError
 
 from blackish.mode import TargetVersion, Feature, supports_feature
 from blackish.nodes import syms
@@ -43,6 +47,17 @@ except ImportError:
 
 
 PY2_HINT: Final = "Python 2 support was removed in version 22.0."
+# Cheap check for what might tell grammars apart, see `scan_grammar_signals`.
+GRAMMAR_SIGNAL_RE: Final = re.compile(
+    r"^[ \t]*match\b(?![ \t]*[=.,(\[)])"
+    r"|\basync\b(?![ \t]+(?:def|for|with)\b)"
+    r"|\bawait\b[ \t]*(?:[=,)\]}:;]|$)",
+    re.MULTILINE,
+)
+# `await` followed by any of these can't be an await expression.
+ASYNC_IDENTIFIER_FOLLOWERS: Final = {"=", ",", ")", "]", "}", ":", ";"}
+# The tokens of bigger files aren't kept for parsing them again, see `TokenBuffer`.
+MAX_BUFFERED_TOKENS: Final = 10_000
 
 
 class InvalidInput(ValueError):
@@ -54,11 +69,11 @@ def get_grammars(target_versions: Set[TargetVersion]) -> List[Grammar]:
         # No target_version specified, so try all grammars.
         return [
             # Python 3.7+
-            pygram.python_grammar_no_print_statement_no_exec_statement_async_keywords,
+            pygram.get_python37_grammar(),
             # Python 3.0-3.6
-            pygram.python_grammar_no_print_statement_no_exec_statement,
+            pygram.get_python3_grammar(),
             # Python 3.10+
-            pygram.python_grammar_soft_keywords,
+            pygram.get_python310_grammar(),
         ]
 
     grammars = []
@@ -67,32 +82,54 @@ def get_grammars(target_versions: Set[TargetVersion]) -> List[Grammar]:
         target_versions, Feature.ASYNC_IDENTIFIERS
     ) and not supports_feature(target_versions, Feature.PATTERN_MATCHING):
         # Python 3.7-3.9
-        grammars.append(
-            pygram.python_grammar_no_print_statement_no_exec_statement_async_keywords
-        )
+        grammars.append(pygram.get_python37_grammar())
     if not supports_feature(target_versions, Feature.ASYNC_KEYWORDS):
         # Python 3.0-3.6
-        grammars.append(pygram.python_grammar_no_print_statement_no_exec_statement)
+        grammars.append(pygram.get_python3_grammar())
     if supports_feature(target_versions, Feature.PATTERN_MATCHING):
         # Python 3.10+
-        grammars.append(pygram.python_grammar_soft_keywords)
+        grammars.append(pygram.get_python310_grammar())
 
     # At least one of the above branches must have been taken, because every Python
     # version has exactly one of the two 'ASYNC_*' flags
     return grammars
 
 
-def lib2to3_parse(src_txt: str, target_versions: Iterable[TargetVersion] = ()) -> Node:
-    """Given a string with source, return the lib2to3 Node."""
+def lib2to3_parse(
+    src_txt: str,
+    target_versions: Iterable[TargetVersion] = (),
+    *,
+    grammar_version: Optional[Tuple[int, int]] = None,
+) -> Node:
+    """Given a string with source, return the lib2to3 Node.
+
+    If `grammar_version` is given, the grammar of that version is tried first,
+    without scanning the source for what might rule it out.
+    """
+    return parse_with_grammar(src_txt, target_versions, grammar_version)[0]
+
+
+def parse_with_grammar(
+    src_txt: str,
+    target_versions: Iterable[TargetVersion] = (),
+    grammar_version: Optional[Tuple[int, int]] = None,
+) -> Tuple[Node, Grammar]:
+    """Like :func:`lib2to3_parse`, but also return the grammar that parsed the
+    source."""
     if not src_txt.endswith("\n"):
         src_txt += "\n"
 
+    tokens = TokenCache(src_txt)
     grammars = get_grammars(set(target_versions))
+    if grammar_version is not None:
+        grammars.sort(key=lambda grammar: grammar.version != grammar_version)
+    else:
+        grammars = order_grammars(grammars, src_txt, tokens.tokens(None))
     errors = {}
     for grammar in grammars:
         drv = driver.Driver(grammar)
         try:
-            result = drv.parse_string(src_txt, True)
+            result = drv.parse_tokens(tokens.tokens(grammar), True)
             break
 
         except ParseError as pe:
@@ -118,8 +155,13 @@ def lib2to3_parse(src_txt: str, target_versions: Iterable[TargetVersion] = ()) -
         assert len(errors) >= 1
         exc = errors[max(errors)]
 
-        if matches_grammar(src_txt, pygram.python_grammar) or matches_grammar(
-            src_txt, pygram.python_grammar_no_print_statement
+        py2_grammars = [
+            pygram.python_grammar,
+            pygram.get_python_grammar_no_print_statement(),
+        ]
+        if any(
+            matches_grammar(src_txt, grammar, tokens.tokens(grammar))
+            for grammar in py2_grammars
         ):
             original_msg = exc.args[0]
             msg = f"{original_msg}\n{PY2_HINT}"
@@ -129,13 +171,166 @@ def lib2to3_parse(src_txt: str, target_versions: Iterable[TargetVersion] = ()) -
 
     if isinstance(result, Leaf):
         result = Node(syms.file_input, [result])
-    return result
-
-
-def matches_grammar(src_txt: str, grammar: Grammar) -> bool:
+    return result, grammar
+
+
+class TokenBuffer:
+    """Replayable tokens, generated on demand by `generate` and kept for the next
+    replay.
+
+    If generating them fails, every replay that gets this far fails with the same
+    exception. Only up to `limit` tokens are kept: the replay that needs more goes
+    on without keeping them, and any other replay generates the tokens again.
+    """
+
+    def __init__(
+        self,
+        generate: Callable[[], Iterator[GoodTokenInfo]],
+        limit: int = MAX_BUFFERED_TOKENS,
+    ) -> None:
+        self._generate = generate
+        self._tokens = generate()
+        self._limit = limit
+        self._buffer: Optional[List[GoodTokenInfo]] = []
+        self._error: Optional[Exception] = None
+        self._done = False
+
+    def __iter__(self) -> Iterator[GoodTokenInfo]:
+        index = 0
+        while self._buffer is not None:
+            if index < len(self._buffer):
+                yield self._buffer[index]
+                index += 1
+            elif self._error is not None:
+                raise self._error
+            elif self._done:
+                return
+            elif len(self._buffer) >= self._limit:
+                self._buffer = None
+                yield from self._tokens
+                return
+            else:
+                try:
+                    self._buffer.append(next(self._tokens))
+                except StopIteration:
+                    self._done = True
+                except Exception as exc:
+                    self._error = exc
+
+        yield from islice(self._generate(), index, None)
+
+
+class TokenCache:
+    """Tokens of `src_txt`, shared by all attempts to parse it.
+
+    The grammars only differ in how they tokenize `async` and `await`, so there's
+    one `TokenBuffer` with `async_keywords` on and one with it off.
+    """
+
+    def __init__(self, src_txt: str) -> None:
+        self.src_txt = src_txt
+        self._buffers: Dict[bool, TokenBuffer] = {}
+
+    def tokens(self, grammar: Optional[Grammar]) -> Iterator[GoodTokenInfo]:
+        """Return the tokens of the source as `grammar` tokenizes it (without async
+        keywords if it's None)."""
+        async_keywords = grammar is not None and grammar.async_keywords
+        buffer = self._buffers.get(async_keywords)
+        if buffer is None:
+            buffer = TokenBuffer(
+                lambda: tokenize.generate_tokens(
+                    io.StringIO(self.src_txt).readline, grammar
+                )
+            )
+            self._buffers[async_keywords] = buffer
+        return iter(buffer)
+
+
+def order_grammars(
+    grammars: List[Grammar],
+    src_txt: str,
+    tokens: Optional[Iterable[GoodTokenInfo]] = None,
+) -> List[Grammar]:
+    """Move the `grammars` that can't parse `src_txt` to the end of the list.
+
+    They're still tried last, so that errors are reported just like before, but
+    valid code is parsed by the same grammar as before without trying the others.
+    `tokens` are passed to :func:`scan_grammar_signals`.
+    """
+    async_identifiers, match_statements = scan_grammar_signals(src_txt, tokens)
+    if not async_identifiers and not match_statements:
+        return grammars
+
+    def fails(grammar: Grammar) -> bool:
+        if async_identifiers and grammar.async_keywords:
+            return True
+
+        return match_statements and not grammar.soft_keywords
+
+    return sorted(grammars, key=fails)
+
+
+def scan_grammar_signals(
+    src_txt: str, tokens: Optional[Iterable[GoodTokenInfo]] = None
+) -> Tuple[bool, bool]:
+    """Return whether `src_txt` uses `async` or `await` as identifiers, and whether it
+    has match statements.
+
+    Only grammars without async keywords can parse the former, and only grammars
+    with soft keywords the latter. Files that show no sign of either in a quick look
+    at their text aren't tokenized. `tokens` are those of `src_txt` without async
+    keywords, if they're already at hand.
+    """
+    if not GRAMMAR_SIGNAL_RE.search(src_txt):
+        return False, False
+
+    async_identifiers = match_statements = False
+    first: Optional[str] = None
+    previous: Optional[Tuple[int, str]] = None
+    try:
+        if tokens is None:
+            tokens = tokenize.generate_tokens(io.StringIO(src_txt).readline)
+        for type, value, _, _, _ in tokens:
+            if type in (tokenize.COMMENT, tokenize.NL, token.INDENT, token.DEDENT):
+                continue
+
+            if previous is not None and previous[0] == token.NAME:
+                # These are keywords inside `async def` but plain names outside.
+                if previous[1] == "async" and value not in ("def", "for", "with"):
+                    async_identifiers = True
+                elif previous[1] == "await" and (
+                    type == token.NEWLINE or value in ASYNC_IDENTIFIER_FOLLOWERS
+                ):
+                    async_identifiers = True
+
+            if type == token.NEWLINE:
+                # Only compound statements end with a colon.
+                if first == "match" and previous == (token.OP, ":"):
+                    match_statements = True
+                first = previous = None
+                continue
+
+            if previous is None:
+                first = value if type == token.NAME else None
+            previous = (type, value)
+    except (TokenError, IndentationError):
+        # The parser will report these.
+        pass
+
+    return async_identifiers, match_statements
+
+
+def matches_grammar(
+    src_txt: str,
+    grammar: Grammar,
+    tokens: Optional[Iterable[GoodTokenInfo]] = None,
+) -> bool:
     drv = driver.Driver(grammar)
     try:
-        drv.parse_string(src_txt, True)
+        if tokens is None:
+            drv.parse_string(src_txt, True)
+        else:
+            drv.parse_tokens(tokens, True)
     except (ParseError, TokenError, IndentationError):
         return False
     else:
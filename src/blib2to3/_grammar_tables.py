@@ -0,0 +1,263 @@
+# Generated by scripts/generate_grammar_tables.py from Grammar.txt and
+# PatternGrammar.txt.  Don't edit, regenerate it instead.
+from typing import Any, Dict, List
+
+from .pgen2.grammar import DFA
+
+_GRAMMAR_STATES: List[DFA] = [
+    [[(1, 1), (2, 0), (3, 0)], [(0, 1)]],
+    [[(43, 1)], [(44, 0), (0, 1)]],
+    [[(45, 1)], [(46, 0), (0, 1)]],
+    [[(47, 1)], [(48, 2)], [(49, 3), (0, 2)], [(50, 4), (51, 4)], [(0, 4)]],
+    [[(52, 1)], [(53, 2), (0, 1)], [(52, 1), (0, 2)]],
+    [[(6, 1), (54, 1), (48, 2)], [(48, 3)], [(55, 1), (49, 4), (56, 1), (57, 3), (0, 2)], [(0, 3)], [(58, 3)]],
+    [[(59, 1)], [(7, 0), (8, 0), (0, 1)]],
+    [[(48, 1)], [(56, 2), (0, 1)], [(48, 3)], [(0, 3)]],
+    [[(13, 1)], [(48, 2)], [(53, 3), (0, 2)], [(48, 4)], [(0, 4)]],
+    [[(38, 1)], [(60, 2)], [(0, 2)]],
+    [[(38, 1)], [(61, 2), (60, 2), (62, 2)], [(0, 2)]],
+    [[(5, 1), (9, 2), (11, 3), (12, 4), (36, 5), (40, 6), (41, 6), (42, 7)], [(63, 6), (64, 8), (51, 8)], [(9, 9)], [(65, 6), (66, 10)], [(67, 11)], [(68, 6), (69, 12)], [(0, 6)], [(42, 7), (0, 7)], [(63, 6)], [(9, 6)], [(65, 6)], [(12, 6)], [(68, 6)]],
+    [[(70, 1), (71, 1), (72, 1), (73, 1), (74, 1), (75, 1), (76, 1), (77, 1), (78, 1), (79, 1), (80, 1), (81, 1), (82, 1)], [(0, 1)]],
+    [[(14, 1)], [(0, 1)]],
+    [[(83, 1)], [(84, 2)], [(47, 3), (85, 4)], [(86, 5)], [(47, 3)], [(0, 5)]],
+    [[(15, 1)], [(40, 2)], [(5, 3), (47, 4)], [(63, 5), (87, 6)], [(86, 7)], [(47, 4)], [(63, 5)], [(0, 7)]],
+    [[(20, 1), (38, 2)], [(88, 3)], [(20, 1)], [(89, 4)], [(90, 5)], [(91, 6), (0, 5)], [(0, 6)]],
+    [[(23, 1)], [(92, 2)], [(91, 3), (0, 2)], [(0, 3)]],
+    [[(57, 1), (93, 1)], [(0, 1)]],
+    [[(94, 1), (95, 1), (96, 1), (94, 1), (97, 1), (98, 1), (99, 1), (89, 1), (100, 2), (27, 3)], [(0, 1)], [(27, 1), (0, 2)], [(89, 1)]],
+    [[(101, 1)], [(102, 0), (0, 1)]],
+    [[(103, 1), (104, 1), (105, 1), (61, 1), (60, 1), (106, 1), (107, 1), (108, 1), (109, 1), (62, 1)], [(0, 1)]],
+    [[(16, 1)], [(0, 1)]],
+    [[(110, 1)], [(111, 2), (104, 2), (60, 2)], [(0, 2)]],
+    [[(10, 1)], [(112, 2)], [(2, 3)], [(0, 3)]],
+    [[(113, 1)], [(113, 1), (0, 1)]],
+    [[(18, 1)], [(88, 2)], [(0, 2)]],
+    [[(54, 1), (114, 2), (48, 3)], [(101, 4)], [(53, 5), (57, 6), (0, 2)], [(53, 5), (47, 7), (55, 8), (57, 6), (0, 3)], [(53, 9), (57, 6), (0, 4)], [(114, 10), (48, 11), (0, 5)], [(0, 6)], [(58, 4)], [(48, 2)], [(54, 12), (48, 13), (0, 9)], [(53, 5), (0, 10)], [(53, 5), (55, 14), (0, 11)], [(101, 15)], [(47, 16)], [(48, 10)], [(53, 9), (0, 15)], [(58, 15)]],
+    [[(115, 1)], [(56, 2), (0, 1)], [(40, 3)], [(0, 3)]],
+    [[(116, 1)], [(53, 0), (0, 1)]],
+    [[(40, 1)], [(9, 0), (0, 1)]],
+    [[(40, 1)], [(0, 1)]],
+    [[(117, 1)], [(1, 2), (2, 1)], [(0, 2)]],
+    [[(118, 1)], [(6, 2), (48, 3), (0, 1)], [(48, 3), (0, 2)], [(53, 4), (56, 4), (0, 3)], [(48, 5)], [(0, 5)]],
+    [[(19, 1)], [(101, 2)], [(89, 3), (0, 2)], [(48, 4)], [(53, 5), (0, 4)], [(48, 6)], [(0, 6)]],
+    [[(119, 1)], [(120, 0), (0, 1)]],
+    [[(50, 1)], [(49, 2), (121, 3), (122, 4), (0, 1)], [(50, 5), (51, 5)], [(0, 3)], [(117, 3), (51, 3)], [(49, 2), (0, 5)]],
+    [[(101, 1), (114, 1)], [(53, 2), (0, 1)], [(101, 1), (114, 1), (0, 2)]],
+    [[(7, 1), (8, 1), (37, 1), (123, 2)], [(124, 2)], [(0, 2)]],
+    [[(125, 1), (126, 1), (127, 1), (128, 1), (129, 1)], [(0, 1)]],
+    [[(20, 1)], [(88, 2)], [(89, 3)], [(50, 4)], [(47, 5)], [(86, 6)], [(130, 7), (0, 6)], [(47, 8)], [(86, 9)], [(0, 9)]],
+    [[(17, 1)], [(40, 2)], [(131, 3)], [(132, 4), (47, 5)], [(48, 6)], [(86, 7)], [(47, 5)], [(0, 7)]],
+    [[(22, 1), (26, 1)], [(40, 2)], [(53, 1), (0, 2)]],
+    [[(23, 1)], [(112, 2)], [(0, 2)]],
+    [[(23, 1)], [(112, 2)], [(47, 3)], [(86, 4)], [(133, 1), (130, 5), (0, 4)], [(47, 6)], [(86, 7)], [(0, 7)]],
+    [[(40, 1)], [(56, 2), (0, 1)], [(40, 3)], [(0, 3)]],
+    [[(134, 1)], [(53, 2), (0, 1)], [(134, 1), (0, 2)]],
+    [[(21, 1)], [(9, 2), (115, 3)], [(9, 2), (24, 4), (115, 3)], [(24, 4)], [(5, 5), (6, 6), (135, 6)], [(135, 7)], [(0, 6)], [(63, 6)]],
+    [[(24, 1)], [(136, 2)], [(0, 2)]],
+    [[(137, 1), (138, 1)], [(0, 1)]],
+    [[(25, 1)], [(47, 2), (139, 3)], [(48, 4)], [(47, 2)], [(0, 4)]],
+    [[(112, 1), (114, 1)], [(53, 2), (140, 3), (0, 1)], [(112, 4), (114, 4), (0, 2)], [(0, 3)], [(53, 2), (0, 4)]],
+    [[(4, 1)], [(141, 2)], [(47, 3)], [(2, 4)], [(142, 5)], [(143, 6)], [(144, 7), (143, 6)], [(0, 7)]],
+    [[(58, 1)], [(55, 2), (0, 1)], [(58, 3)], [(0, 3)]],
+    [[(27, 1), (145, 2)], [(45, 2)], [(0, 2)]],
+    [[(20, 1), (38, 2)], [(88, 3)], [(20, 1)], [(89, 4)], [(146, 5)], [(147, 6), (0, 5)], [(0, 6)]],
+    [[(23, 1)], [(92, 2)], [(147, 3), (0, 2)], [(0, 3)]],
+    [[(140, 1), (148, 1)], [(0, 1)]],
+    [[(25, 1)], [(47, 2), (139, 3)], [(92, 4)], [(47, 2)], [(0, 4)]],
+    [[(149, 1), (90, 1)], [(0, 1)]],
+    [[(150, 1)], [(151, 0), (0, 1)]],
+    [[(5, 1)], [(63, 2), (152, 3)], [(0, 2)], [(63, 2)]],
+    [[(28, 1)], [(0, 1)]],
+    [[(101, 1), (114, 1)], [(56, 2), (0, 1)], [(101, 3)], [(0, 3)]],
+    [[(153, 1)], [(53, 2), (0, 1)], [(153, 1), (0, 2)]],
+    [[(39, 1), (154, 2)], [(154, 2)], [(54, 3), (155, 2), (0, 2)], [(124, 4)], [(0, 4)]],
+    [[(29, 1)], [(156, 2), (48, 3), (0, 1)], [(48, 4)], [(53, 5), (0, 3)], [(53, 6), (0, 4)], [(48, 3), (0, 5)], [(48, 7)], [(53, 8), (0, 7)], [(48, 7), (0, 8)]],
+    [[(30, 1)], [(48, 2), (0, 1)], [(53, 3), (21, 4), (0, 2)], [(48, 5)], [(48, 6)], [(53, 4), (0, 5)], [(0, 6)]],
+    [[(31, 1)], [(50, 2), (0, 1)], [(0, 2)]],
+    [[(157, 1)], [(158, 0), (156, 0), (0, 1)]],
+    [[(159, 1)], [(160, 2), (2, 3)], [(2, 3), (159, 1)], [(0, 3)]],
+    [[(2, 1), (161, 2), (162, 1)], [(0, 1)], [(2, 1)]],
+    [[(47, 1)], [(48, 2), (0, 1)], [(0, 2)]],
+    [[(163, 1), (164, 1), (165, 1), (166, 1), (167, 1), (168, 1), (169, 1), (170, 1), (171, 1)], [(0, 1)]],
+    [[(6, 1)], [(101, 2)], [(0, 2)]],
+    [[(161, 1), (162, 1)], [(0, 1)]],
+    [[(112, 1), (114, 1)], [(53, 2), (0, 1)], [(112, 1), (114, 1), (0, 2)]],
+    [[(47, 1), (48, 2)], [(172, 3), (48, 4), (0, 1)], [(47, 1), (55, 5), (0, 2)], [(0, 3)], [(172, 3), (0, 4)], [(48, 3)]],
+    [[(114, 1), (173, 1)], [(53, 2), (0, 1)], [(114, 1), (173, 1), (0, 2)]],
+    [[(2, 1), (162, 2)], [(142, 3)], [(0, 2)], [(3, 4)], [(144, 2), (3, 4)]],
+    [[(124, 1)], [(174, 0), (6, 0), (175, 0), (176, 0), (10, 0), (0, 1)]],
+    [[(177, 1), (90, 2)], [(0, 1)], [(23, 3), (0, 2)], [(90, 4)], [(130, 5)], [(48, 1)]],
+    [[(48, 1)], [(53, 2), (0, 1)], [(48, 1), (0, 2)]],
+    [[(48, 1)], [(53, 0), (0, 1)]],
+    [[(112, 1), (114, 1)], [(53, 2), (140, 3), (0, 1)], [(112, 4), (114, 4), (0, 2)], [(0, 3)], [(53, 2), (0, 4)]],
+    [[(92, 1)], [(53, 2), (0, 1)], [(92, 3)], [(53, 4), (0, 3)], [(92, 3), (0, 4)]],
+    [[(114, 1), (48, 1)], [(53, 2), (0, 1)], [(114, 1), (48, 1), (0, 2)]],
+    [[(5, 1), (178, 2)], [(179, 3)], [(0, 2)], [(63, 2)]],
+    [[(180, 1)], [(53, 2), (0, 1)], [(180, 1), (0, 2)]],
+    [[(40, 1)], [(47, 2), (0, 1)], [(48, 3)], [(0, 3)]],
+    [[(40, 1)], [(47, 2), (0, 1)], [(114, 3), (48, 3)], [(0, 3)]],
+    [[(5, 1), (9, 2), (11, 3)], [(63, 4), (87, 5)], [(40, 4)], [(181, 6)], [(0, 4)], [(63, 4)], [(65, 4)]],
+    [[(32, 1)], [(47, 2)], [(86, 3)], [(182, 4), (183, 5)], [(47, 6)], [(47, 7)], [(86, 8)], [(86, 9)], [(0, 8)], [(130, 10), (182, 4), (183, 5), (0, 9)], [(47, 11)], [(86, 12)], [(182, 4), (0, 12)]],
+    [[(6, 1), (54, 2), (180, 3)], [(53, 4), (184, 5), (0, 1)], [(178, 6)], [(53, 7), (49, 8), (0, 3)], [(54, 2), (178, 9), (0, 4)], [(53, 4), (0, 5)], [(53, 10), (0, 6)], [(6, 1), (54, 2), (175, 11), (180, 3), (0, 7)], [(48, 12)], [(53, 4), (49, 13), (0, 9)], [(0, 10)], [(53, 14), (0, 11)], [(53, 7), (0, 12)], [(48, 5)], [(6, 15), (54, 2), (180, 16), (0, 14)], [(53, 17), (184, 18), (0, 15)], [(53, 14), (49, 19), (0, 16)], [(54, 2), (178, 20), (0, 17)], [(53, 17), (0, 18)], [(48, 11)], [(53, 17), (49, 21), (0, 20)], [(48, 18)]],
+    [[(6, 1), (54, 2), (185, 3)], [(53, 4), (186, 5), (0, 1)], [(186, 6)], [(53, 7), (49, 8), (0, 3)], [(54, 2), (186, 9), (0, 4)], [(53, 4), (0, 5)], [(53, 10), (0, 6)], [(6, 1), (54, 2), (175, 11), (185, 3), (0, 7)], [(48, 12)], [(53, 4), (49, 13), (0, 9)], [(0, 10)], [(53, 14), (0, 11)], [(53, 7), (0, 12)], [(48, 5)], [(6, 15), (54, 2), (185, 16), (0, 14)], [(53, 17), (186, 18), (0, 15)], [(53, 14), (49, 19), (0, 16)], [(54, 2), (186, 20), (0, 17)], [(53, 17), (0, 18)], [(48, 11)], [(53, 17), (49, 21), (0, 20)], [(48, 18)]],
+    [[(5, 1), (186, 2)], [(187, 3)], [(0, 2)], [(63, 2)]],
+    [[(185, 1)], [(53, 2), (0, 1)], [(185, 1), (0, 2)]],
+    [[(40, 1)], [(0, 1)]],
+    [[(33, 1)], [(112, 2)], [(47, 3)], [(86, 4)], [(130, 5), (0, 4)], [(47, 6)], [(86, 7)], [(0, 7)]],
+    [[(34, 1)], [(58, 2)], [(53, 1), (47, 3)], [(86, 4)], [(0, 4)]],
+    [[(188, 1)], [(189, 0), (0, 1)]],
+    [[(21, 1), (50, 2)], [(48, 2)], [(0, 2)]],
+    [[(35, 1)], [(190, 2), (0, 1)], [(0, 2)]],
+    [[(51, 1)], [(0, 1)]],
+]
+GRAMMAR: Dict[str, Any] = {
+    'symbol2number': {'file_input': 256, 'and_expr': 257, 'and_test': 258, 'annassign': 259, 'arglist': 260, 'argument': 261, 'arith_expr': 262, 'asexpr_test': 263, 'assert_stmt': 264, 'async_funcdef': 265, 'async_stmt': 266, 'atom': 267, 'augassign': 268, 'break_stmt': 269, 'case_block': 270, 'classdef': 271, 'comp_for': 272, 'comp_if': 273, 'comp_iter': 274, 'comp_op': 275, 'comparison': 276, 'compound_stmt': 277, 'continue_stmt': 278, 'decorated': 279, 'decorator': 280, 'decorators': 281, 'del_stmt': 282, 'dictsetmaker': 283, 'dotted_as_name': 284, 'dotted_as_names': 285, 'dotted_name': 286, 'encoding_decl': 287, 'eval_input': 288, 'except_clause': 289, 'exec_stmt': 290, 'expr': 291, 'expr_stmt': 292, 'exprlist': 293, 'factor': 294, 'flow_stmt': 295, 'for_stmt': 296, 'funcdef': 297, 'global_stmt': 298, 'guard': 299, 'if_stmt': 300, 'import_as_name': 301, 'import_as_names': 302, 'import_from': 303, 'import_name': 304, 'import_stmt': 305, 'lambdef': 306, 'listmaker': 307, 'match_stmt': 308, 'namedexpr_test': 309, 'not_test': 310, 'old_comp_for': 311, 'old_comp_if': 312, 'old_comp_iter': 313, 'old_lambdef': 314, 'old_test': 315, 'or_test': 316, 'parameters': 317, 'pass_stmt': 318, 'pattern': 319, 'patterns': 320, 'power': 321, 'print_stmt': 322, 'raise_stmt': 323, 'return_stmt': 324, 'shift_expr': 325, 'simple_stmt': 326, 'single_input': 327, 'sliceop': 328, 'small_stmt': 329, 'star_expr': 330, 'stmt': 331, 'subject_expr': 332, 'subscript': 333, 'subscriptlist': 334, 'suite': 335, 'term': 336, 'test': 337, 'testlist': 338, 'testlist1': 339, 'testlist_gexp': 340, 'testlist_safe': 341, 'testlist_star_expr': 342, 'tfpdef': 343, 'tfplist': 344, 'tname': 345, 'tname_star': 346, 'trailer': 347, 'try_stmt': 348, 'typedargslist': 349, 'varargslist': 350, 'vfpdef': 351, 'vfplist': 352, 'vname': 353, 'while_stmt': 354, 'with_stmt': 355, 'xor_expr': 356, 'yield_arg': 357, 'yield_expr': 358, 'yield_stmt': 359},
+    'number2symbol': {256: 'file_input', 257: 'and_expr', 258: 'and_test', 259: 'annassign', 260: 'arglist', 261: 'argument', 262: 'arith_expr', 263: 'asexpr_test', 264: 'assert_stmt', 265: 'async_funcdef', 266: 'async_stmt', 267: 'atom', 268: 'augassign', 269: 'break_stmt', 270: 'case_block', 271: 'classdef', 272: 'comp_for', 273: 'comp_if', 274: 'comp_iter', 275: 'comp_op', 276: 'comparison', 277: 'compound_stmt', 278: 'continue_stmt', 279: 'decorated', 280: 'decorator', 281: 'decorators', 282: 'del_stmt', 283: 'dictsetmaker', 284: 'dotted_as_name', 285: 'dotted_as_names', 286: 'dotted_name', 287: 'encoding_decl', 288: 'eval_input', 289: 'except_clause', 290: 'exec_stmt', 291: 'expr', 292: 'expr_stmt', 293: 'exprlist', 294: 'factor', 295: 'flow_stmt', 296: 'for_stmt', 297: 'funcdef', 298: 'global_stmt', 299: 'guard', 300: 'if_stmt', 301: 'import_as_name', 302: 'import_as_names', 303: 'import_from', 304: 'import_name', 305: 'import_stmt', 306: 'lambdef', 307: 'listmaker', 308: 'match_stmt', 309: 'namedexpr_test', 310: 'not_test', 311: 'old_comp_for', 312: 'old_comp_if', 313: 'old_comp_iter', 314: 'old_lambdef', 315: 'old_test', 316: 'or_test', 317: 'parameters', 318: 'pass_stmt', 319: 'pattern', 320: 'patterns', 321: 'power', 322: 'print_stmt', 323: 'raise_stmt', 324: 'return_stmt', 325: 'shift_expr', 326: 'simple_stmt', 327: 'single_input', 328: 'sliceop', 329: 'small_stmt', 330: 'star_expr', 331: 'stmt', 332: 'subject_expr', 333: 'subscript', 334: 'subscriptlist', 335: 'suite', 336: 'term', 337: 'test', 338: 'testlist', 339: 'testlist1', 340: 'testlist_gexp', 341: 'testlist_safe', 342: 'testlist_star_expr', 343: 'tfpdef', 344: 'tfplist', 345: 'tname', 346: 'tname_star', 347: 'trailer', 348: 'try_stmt', 349: 'typedargslist', 350: 'varargslist', 351: 'vfpdef', 352: 'vfplist', 353: 'vname', 354: 'while_stmt', 355: 'with_stmt', 356: 'xor_expr', 357: 'yield_arg', 358: 'yield_expr', 359: 'yield_stmt'},
+    'states': _GRAMMAR_STATES,
+    'dfas': {
+        256: (_GRAMMAR_STATES[0], {4: 1, 5: 1, 6: 1, 7: 1, 8: 1, 9: 1, 10: 1, 11: 1, 12: 1, 13: 1, 14: 1, 15: 1, 16: 1, 17: 1, 18: 1, 19: 1, 20: 1, 21: 1, 22: 1, 23: 1, 24: 1, 25: 1, 26: 1, 27: 1, 28: 1, 29: 1, 30: 1, 31: 1, 32: 1, 33: 1, 34: 1, 35: 1, 36: 1, 37: 1, 38: 1, 39: 1, 1: 1, 40: 1, 2: 1, 41: 1, 42: 1}),
+        257: (_GRAMMAR_STATES[1], {5: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        258: (_GRAMMAR_STATES[2], {5: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 27: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        259: (_GRAMMAR_STATES[3], {47: 1}),
+        260: (_GRAMMAR_STATES[4], {5: 1, 6: 1, 54: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 25: 1, 27: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        261: (_GRAMMAR_STATES[5], {5: 1, 6: 1, 54: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 25: 1, 27: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        262: (_GRAMMAR_STATES[6], {5: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        263: (_GRAMMAR_STATES[7], {5: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 25: 1, 27: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        264: (_GRAMMAR_STATES[8], {13: 1}),
+        265: (_GRAMMAR_STATES[9], {38: 1}),
+        266: (_GRAMMAR_STATES[10], {38: 1}),
+        267: (_GRAMMAR_STATES[11], {5: 1, 9: 1, 11: 1, 12: 1, 36: 1, 40: 1, 41: 1, 42: 1}),
+        268: (_GRAMMAR_STATES[12], {70: 1, 71: 1, 72: 1, 73: 1, 74: 1, 75: 1, 76: 1, 77: 1, 78: 1, 79: 1, 80: 1, 81: 1, 82: 1}),
+        269: (_GRAMMAR_STATES[13], {14: 1}),
+        270: (_GRAMMAR_STATES[14], {83: 1}),
+        271: (_GRAMMAR_STATES[15], {15: 1}),
+        272: (_GRAMMAR_STATES[16], {20: 1, 38: 1}),
+        273: (_GRAMMAR_STATES[17], {23: 1}),
+        274: (_GRAMMAR_STATES[18], {20: 1, 23: 1, 38: 1}),
+        275: (_GRAMMAR_STATES[19], {94: 1, 95: 1, 96: 1, 97: 1, 98: 1, 99: 1, 89: 1, 100: 1, 27: 1}),
+        276: (_GRAMMAR_STATES[20], {5: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        277: (_GRAMMAR_STATES[21], {4: 1, 10: 1, 15: 1, 17: 1, 20: 1, 23: 1, 32: 1, 33: 1, 34: 1, 38: 1}),
+        278: (_GRAMMAR_STATES[22], {16: 1}),
+        279: (_GRAMMAR_STATES[23], {10: 1}),
+        280: (_GRAMMAR_STATES[24], {10: 1}),
+        281: (_GRAMMAR_STATES[25], {10: 1}),
+        282: (_GRAMMAR_STATES[26], {18: 1}),
+        283: (_GRAMMAR_STATES[27], {5: 1, 6: 1, 54: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 25: 1, 27: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        284: (_GRAMMAR_STATES[28], {40: 1}),
+        285: (_GRAMMAR_STATES[29], {40: 1}),
+        286: (_GRAMMAR_STATES[30], {40: 1}),
+        287: (_GRAMMAR_STATES[31], {40: 1}),
+        288: (_GRAMMAR_STATES[32], {5: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 25: 1, 27: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        289: (_GRAMMAR_STATES[33], {118: 1}),
+        290: (_GRAMMAR_STATES[34], {19: 1}),
+        291: (_GRAMMAR_STATES[35], {5: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        292: (_GRAMMAR_STATES[36], {5: 1, 6: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 25: 1, 27: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        293: (_GRAMMAR_STATES[37], {5: 1, 6: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        294: (_GRAMMAR_STATES[38], {5: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        295: (_GRAMMAR_STATES[39], {14: 1, 16: 1, 30: 1, 31: 1, 35: 1}),
+        296: (_GRAMMAR_STATES[40], {20: 1}),
+        297: (_GRAMMAR_STATES[41], {17: 1}),
+        298: (_GRAMMAR_STATES[42], {22: 1, 26: 1}),
+        299: (_GRAMMAR_STATES[43], {23: 1}),
+        300: (_GRAMMAR_STATES[44], {23: 1}),
+        301: (_GRAMMAR_STATES[45], {40: 1}),
+        302: (_GRAMMAR_STATES[46], {40: 1}),
+        303: (_GRAMMAR_STATES[47], {21: 1}),
+        304: (_GRAMMAR_STATES[48], {24: 1}),
+        305: (_GRAMMAR_STATES[49], {21: 1, 24: 1}),
+        306: (_GRAMMAR_STATES[50], {25: 1}),
+        307: (_GRAMMAR_STATES[51], {5: 1, 6: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 25: 1, 27: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        308: (_GRAMMAR_STATES[52], {4: 1}),
+        309: (_GRAMMAR_STATES[53], {5: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 25: 1, 27: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        310: (_GRAMMAR_STATES[54], {5: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 27: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        311: (_GRAMMAR_STATES[55], {20: 1, 38: 1}),
+        312: (_GRAMMAR_STATES[56], {23: 1}),
+        313: (_GRAMMAR_STATES[57], {20: 1, 23: 1, 38: 1}),
+        314: (_GRAMMAR_STATES[58], {25: 1}),
+        315: (_GRAMMAR_STATES[59], {5: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 25: 1, 27: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        316: (_GRAMMAR_STATES[60], {5: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 27: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        317: (_GRAMMAR_STATES[61], {5: 1}),
+        318: (_GRAMMAR_STATES[62], {28: 1}),
+        319: (_GRAMMAR_STATES[63], {5: 1, 6: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        320: (_GRAMMAR_STATES[64], {5: 1, 6: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        321: (_GRAMMAR_STATES[65], {5: 1, 9: 1, 11: 1, 12: 1, 36: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        322: (_GRAMMAR_STATES[66], {29: 1}),
+        323: (_GRAMMAR_STATES[67], {30: 1}),
+        324: (_GRAMMAR_STATES[68], {31: 1}),
+        325: (_GRAMMAR_STATES[69], {5: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        326: (_GRAMMAR_STATES[70], {5: 1, 6: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 13: 1, 14: 1, 16: 1, 18: 1, 19: 1, 21: 1, 22: 1, 24: 1, 25: 1, 26: 1, 27: 1, 28: 1, 29: 1, 30: 1, 31: 1, 35: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        327: (_GRAMMAR_STATES[71], {4: 1, 5: 1, 6: 1, 7: 1, 8: 1, 9: 1, 10: 1, 11: 1, 12: 1, 13: 1, 14: 1, 15: 1, 16: 1, 17: 1, 18: 1, 19: 1, 20: 1, 21: 1, 22: 1, 23: 1, 24: 1, 25: 1, 26: 1, 27: 1, 28: 1, 29: 1, 30: 1, 31: 1, 32: 1, 33: 1, 34: 1, 35: 1, 36: 1, 37: 1, 38: 1, 39: 1, 40: 1, 2: 1, 41: 1, 42: 1}),
+        328: (_GRAMMAR_STATES[72], {47: 1}),
+        329: (_GRAMMAR_STATES[73], {5: 1, 6: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 13: 1, 14: 1, 16: 1, 18: 1, 19: 1, 21: 1, 22: 1, 24: 1, 25: 1, 26: 1, 27: 1, 28: 1, 29: 1, 30: 1, 31: 1, 35: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        330: (_GRAMMAR_STATES[74], {6: 1}),
+        331: (_GRAMMAR_STATES[75], {4: 1, 5: 1, 6: 1, 7: 1, 8: 1, 9: 1, 10: 1, 11: 1, 12: 1, 13: 1, 14: 1, 15: 1, 16: 1, 17: 1, 18: 1, 19: 1, 20: 1, 21: 1, 22: 1, 23: 1, 24: 1, 25: 1, 26: 1, 27: 1, 28: 1, 29: 1, 30: 1, 31: 1, 32: 1, 33: 1, 34: 1, 35: 1, 36: 1, 37: 1, 38: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        332: (_GRAMMAR_STATES[76], {5: 1, 6: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 25: 1, 27: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        333: (_GRAMMAR_STATES[77], {5: 1, 7: 1, 8: 1, 9: 1, 47: 1, 11: 1, 12: 1, 25: 1, 27: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        334: (_GRAMMAR_STATES[78], {5: 1, 6: 1, 7: 1, 8: 1, 9: 1, 47: 1, 11: 1, 12: 1, 25: 1, 27: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        335: (_GRAMMAR_STATES[79], {5: 1, 6: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 13: 1, 14: 1, 16: 1, 18: 1, 19: 1, 21: 1, 22: 1, 24: 1, 25: 1, 26: 1, 27: 1, 28: 1, 29: 1, 30: 1, 31: 1, 35: 1, 36: 1, 37: 1, 39: 1, 40: 1, 2: 1, 41: 1, 42: 1}),
+        336: (_GRAMMAR_STATES[80], {5: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        337: (_GRAMMAR_STATES[81], {5: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 25: 1, 27: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        338: (_GRAMMAR_STATES[82], {5: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 25: 1, 27: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        339: (_GRAMMAR_STATES[83], {5: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 25: 1, 27: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        340: (_GRAMMAR_STATES[84], {5: 1, 6: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 25: 1, 27: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        341: (_GRAMMAR_STATES[85], {5: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 25: 1, 27: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        342: (_GRAMMAR_STATES[86], {5: 1, 6: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 25: 1, 27: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        343: (_GRAMMAR_STATES[87], {5: 1, 40: 1}),
+        344: (_GRAMMAR_STATES[88], {5: 1, 40: 1}),
+        345: (_GRAMMAR_STATES[89], {40: 1}),
+        346: (_GRAMMAR_STATES[90], {40: 1}),
+        347: (_GRAMMAR_STATES[91], {5: 1, 9: 1, 11: 1}),
+        348: (_GRAMMAR_STATES[92], {32: 1}),
+        349: (_GRAMMAR_STATES[93], {5: 1, 6: 1, 54: 1, 40: 1}),
+        350: (_GRAMMAR_STATES[94], {5: 1, 6: 1, 54: 1, 40: 1}),
+        351: (_GRAMMAR_STATES[95], {5: 1, 40: 1}),
+        352: (_GRAMMAR_STATES[96], {5: 1, 40: 1}),
+        353: (_GRAMMAR_STATES[97], {40: 1}),
+        354: (_GRAMMAR_STATES[98], {33: 1}),
+        355: (_GRAMMAR_STATES[99], {34: 1}),
+        356: (_GRAMMAR_STATES[100], {5: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        357: (_GRAMMAR_STATES[101], {5: 1, 6: 1, 7: 1, 8: 1, 9: 1, 11: 1, 12: 1, 21: 1, 25: 1, 27: 1, 36: 1, 37: 1, 39: 1, 40: 1, 41: 1, 42: 1}),
+        358: (_GRAMMAR_STATES[102], {35: 1}),
+        359: (_GRAMMAR_STATES[103], {35: 1}),
+    },
+    'labels': [(0, 'EMPTY'), (0, None), (4, None), (331, None), (1, 'match'), (7, None), (16, None), (14, None), (15, None), (23, None), (50, None), (9, None), (25, None), (1, 'assert'), (1, 'break'), (1, 'class'), (1, 'continue'), (1, 'def'), (1, 'del'), (1, 'exec'), (1, 'for'), (1, 'from'), (1, 'global'), (1, 'if'), (1, 'import'), (1, 'lambda'), (1, 'nonlocal'), (1, 'not'), (1, 'pass'), (1, 'print'), (1, 'raise'), (1, 'return'), (1, 'try'), (1, 'while'), (1, 'with'), (1, 'yield'), (26, None), (32, None), (57, None), (56, None), (1, None), (2, None), (3, None), (325, None), (19, None), (310, None), (1, 'and'), (11, None), (337, None), (22, None), (342, None), (358, None), (261, None), (12, None), (36, None), (59, None), (1, 'as'), (272, None), (263, None), (336, None), (297, None), (296, None), (355, None), (8, None), (340, None), (10, None), (307, None), (339, None), (27, None), (283, None), (41, None), (42, None), (47, None), (39, None), (37, None), (38, None), (49, None), (40, None), (45, None), (46, None), (51, None), (44, None), (43, None), (1, 'case'), (320, None), (299, None), (335, None), (260, None), (293, None), (1, 'in'), (316, None), (274, None), (315, None), (273, None), (29, None), (20, None), (30, None), (28, None), (21, None), (31, None), (1, 'is'), (291, None), (275, None), (266, None), (271, None), (279, None), (300, None), (308, None), (348, None), (354, None), (281, None), (265, None), (309, None), (280, None), (330, None), (286, None), (284, None), (338, None), (1, 'except'), (356, None), (18, None), (259, None), (268, None), (321, None), (294, None), (269, None), (278, None), (323, None), (324, None), (359, None), (1, 'else'), (317, None), (55, None), (1, 'elif'), (301, None), (302, None), (285, None), (303, None), (304, None), (350, None), (311, None), (332, None), (5, None), (270, None), (6, None), (276, None), (341, None), (313, None), (312, None), (314, None), (258, None), (1, 'or'), (349, None), (319, None), (267, None), (347, None), (35, None), (262, None), (34, None), (329, None), (13, None), (277, None), (326, None), (264, None), (282, None), (290, None), (292, None), (295, None), (298, None), (305, None), (318, None), (322, None), (328, None), (333, None), (24, None), (17, None), (48, None), (306, None), (345, None), (344, None), (343, None), (334, None), (1, 'finally'), (289, None), (346, None), (351, None), (353, None), (352, None), (257, None), (33, None), (357, None)],
+    'keywords': {'assert': 13, 'break': 14, 'class': 15, 'continue': 16, 'def': 17, 'del': 18, 'exec': 19, 'for': 20, 'from': 21, 'global': 22, 'if': 23, 'import': 24, 'lambda': 25, 'nonlocal': 26, 'not': 27, 'pass': 28, 'print': 29, 'raise': 30, 'return': 31, 'try': 32, 'while': 33, 'with': 34, 'yield': 35, 'and': 46, 'as': 56, 'in': 89, 'is': 100, 'except': 118, 'else': 130, 'elif': 133, 'or': 151, 'finally': 182},
+    'soft_keywords': {'match': 4, 'case': 83},
+    'tokens': {0: 1, 4: 2, 7: 5, 16: 6, 14: 7, 15: 8, 23: 9, 50: 10, 9: 11, 25: 12, 26: 36, 32: 37, 57: 38, 56: 39, 1: 40, 2: 41, 3: 42, 19: 44, 11: 47, 22: 49, 12: 53, 36: 54, 59: 55, 8: 63, 10: 65, 27: 68, 41: 70, 42: 71, 47: 72, 39: 73, 37: 74, 38: 75, 49: 76, 40: 77, 45: 78, 46: 79, 51: 80, 44: 81, 43: 82, 29: 94, 20: 95, 30: 96, 28: 97, 21: 98, 31: 99, 18: 120, 55: 132, 5: 142, 6: 144, 35: 156, 34: 158, 13: 160, 24: 174, 17: 175, 48: 176, 33: 189},
+    'symbol2label': {'stmt': 3, 'shift_expr': 43, 'not_test': 45, 'test': 48, 'testlist_star_expr': 50, 'yield_expr': 51, 'argument': 52, 'comp_for': 57, 'asexpr_test': 58, 'term': 59, 'funcdef': 60, 'for_stmt': 61, 'with_stmt': 62, 'testlist_gexp': 64, 'listmaker': 66, 'testlist1': 67, 'dictsetmaker': 69, 'patterns': 84, 'guard': 85, 'suite': 86, 'arglist': 87, 'exprlist': 88, 'or_test': 90, 'comp_iter': 91, 'old_test': 92, 'comp_if': 93, 'expr': 101, 'comp_op': 102, 'async_stmt': 103, 'classdef': 104, 'decorated': 105, 'if_stmt': 106, 'match_stmt': 107, 'try_stmt': 108, 'while_stmt': 109, 'decorators': 110, 'async_funcdef': 111, 'namedexpr_test': 112, 'decorator': 113, 'star_expr': 114, 'dotted_name': 115, 'dotted_as_name': 116, 'testlist': 117, 'xor_expr': 119, 'annassign': 121, 'augassign': 122, 'power': 123, 'factor': 124, 'break_stmt': 125, 'continue_stmt': 126, 'raise_stmt': 127, 'return_stmt': 128, 'yield_stmt': 129, 'parameters': 131, 'import_as_name': 134, 'import_as_names': 135, 'dotted_as_names': 136, 'import_from': 137, 'import_name': 138, 'varargslist': 139, 'old_comp_for': 140, 'subject_expr': 141, 'case_block': 143, 'comparison': 145, 'testlist_safe': 146, 'old_comp_iter': 147, 'old_comp_if': 148, 'old_lambdef': 149, 'and_test': 150, 'typedargslist': 152, 'pattern': 153, 'atom': 154, 'trailer': 155, 'arith_expr': 157, 'small_stmt': 159, 'compound_stmt': 161, 'simple_stmt': 162, 'assert_stmt': 163, 'del_stmt': 164, 'exec_stmt': 165, 'expr_stmt': 166, 'flow_stmt': 167, 'global_stmt': 168, 'import_stmt': 169, 'pass_stmt': 170, 'print_stmt': 171, 'sliceop': 172, 'subscript': 173, 'lambdef': 177, 'tname': 178, 'tfplist': 179, 'tfpdef': 180, 'subscriptlist': 181, 'except_clause': 183, 'tname_star': 184, 'vfpdef': 185, 'vname': 186, 'vfplist': 187, 'and_expr': 188, 'yield_arg': 190},
+    'version': (0, 0),
+    'start': 256,
+    'async_keywords': False,
+}
+
+_PATTERN_GRAMMAR_STATES: List[DFA] = [
+    [[(1, 1)], [(2, 2)], [(0, 2)]],
+    [[(8, 1), (9, 1)], [(8, 1), (9, 1), (0, 1)]],
+    [[(10, 1)], [(11, 0), (0, 1)]],
+    [[(12, 1)], [(1, 2)], [(13, 3)], [(0, 3)]],
+    [[(5, 1)], [(3, 2), (6, 3), (7, 4)], [(1, 5)], [(14, 4), (0, 3)], [(0, 4)], [(15, 4)]],
+    [[(16, 1), (17, 1), (18, 2)], [(0, 1)], [(19, 3)], [(20, 4), (21, 1)], [(19, 5)], [(21, 1)]],
+    [[(3, 1), (4, 2), (6, 3), (7, 4)], [(1, 5)], [(1, 6)], [(22, 7), (14, 4), (23, 8), (0, 3)], [(23, 8), (0, 4)], [(15, 4)], [(24, 8)], [(3, 1), (4, 2), (6, 9), (7, 4)], [(0, 8)], [(14, 4), (23, 8), (0, 9)]],
+]
+PATTERN_GRAMMAR: Dict[str, Any] = {
+    'symbol2number': {'Matcher': 256, 'Alternative': 257, 'Alternatives': 258, 'Details': 259, 'NegatedUnit': 260, 'Repeater': 261, 'Unit': 262},
+    'number2symbol': {256: 'Matcher', 257: 'Alternative', 258: 'Alternatives', 259: 'Details', 260: 'NegatedUnit', 261: 'Repeater', 262: 'Unit'},
+    'states': _PATTERN_GRAMMAR_STATES,
+    'dfas': {
+        256: (_PATTERN_GRAMMAR_STATES[0], {3: 1, 4: 1, 5: 1, 6: 1, 7: 1}),
+        257: (_PATTERN_GRAMMAR_STATES[1], {3: 1, 4: 1, 5: 1, 6: 1, 7: 1}),
+        258: (_PATTERN_GRAMMAR_STATES[2], {3: 1, 4: 1, 5: 1, 6: 1, 7: 1}),
+        259: (_PATTERN_GRAMMAR_STATES[3], {12: 1}),
+        260: (_PATTERN_GRAMMAR_STATES[4], {5: 1}),
+        261: (_PATTERN_GRAMMAR_STATES[5], {16: 1, 17: 1, 18: 1}),
+        262: (_PATTERN_GRAMMAR_STATES[6], {3: 1, 4: 1, 6: 1, 7: 1}),
+    },
+    'labels': [(0, 'EMPTY'), (258, None), (0, None), (7, None), (9, None), (1, 'not'), (1, None), (3, None), (260, None), (262, None), (257, None), (18, None), (20, None), (21, None), (259, None), (8, None), (16, None), (14, None), (26, None), (2, None), (12, None), (27, None), (22, None), (261, None), (10, None)],
+    'keywords': {'not': 5},
+    'soft_keywords': {},
+    'tokens': {0: 2, 7: 3, 9: 4, 1: 6, 3: 7, 18: 11, 20: 12, 21: 13, 8: 15, 16: 16, 14: 17, 26: 18, 2: 19, 12: 20, 27: 21, 22: 22, 10: 24},
+    'symbol2label': {'Alternatives': 1, 'NegatedUnit': 8, 'Unit': 9, 'Alternative': 10, 'Details': 14, 'Repeater': 23},
+    'version': (0, 0),
+    'start': 256,
+    'async_keywords': False,
+}
@@ -24,6 +24,7 @@ import sys
 from typing import (
     Any,
     cast,
+    Deque,
     IO,
     Iterable,
     List,
@@ -35,8 +36,8 @@ from typing import (
     Generic,
     Union,
 )
+from collections import deque
 from contextlib import contextmanager
-from dataclasses import dataclass, field
 
 # Pgen imports
 from . import grammar, parse, token, tokenize, pgen
@@ -48,62 +49,36 @@ from blib2to3.pgen2.tokenize import GoodTokenInfo
 Path = Union[str, "os.PathLike[str]"]
 
 
-@dataclass
-class ReleaseRange:
-    start: int
-    end: Optional[int] = None
-    tokens: List[Any] = field(default_factory=list)
-
-    def lock(self) -> None:
-        total_eaten = len(self.tokens)
-        self.end = self.start + total_eaten
-
-
 class TokenProxy:
     def __init__(self, generator: Any) -> None:
         self._tokens = generator
-        self._counter = 0
-        self._release_ranges: List[ReleaseRange] = []
+        # The tokens that were looked at by eat() but not yet returned by
+        # __next__, in order.  Consumed tokens are dropped from it, so getting the
+        # next token doesn't depend on how often the parser looked ahead before.
+        self._lookahead: Deque[Any] = deque()
 
     @contextmanager
     def release(self) -> Iterator["TokenProxy"]:
-        release_range = ReleaseRange(self._counter)
-        self._release_ranges.append(release_range)
-        try:
-            yield self
-        finally:
-            # Lock the last release range to the final position that
-            # has been eaten.
-            release_range.lock()
+        # Looking ahead doesn't consume any token, so everything that was eaten
+        # is still returned by __next__ afterwards.
+        yield self
 
     def eat(self, point: int) -> Any:
-        eaten_tokens = self._release_ranges[-1].tokens
-        if point < len(eaten_tokens):
-            return eaten_tokens[point]
-        else:
-            while point >= len(eaten_tokens):
-                token = next(self._tokens)
-                eaten_tokens.append(token)
-            return token
+        eaten_tokens = self._lookahead
+        while point >= len(eaten_tokens):
+            eaten_tokens.append(next(self._tokens))
+        return eaten_tokens[point]
 
     def __iter__(self) -> "TokenProxy":
         return self
 
     def __next__(self) -> Any:
-        # If the current position is already compromised (looked up)
-        # return the eaten token, if not just go further on the given
-        # token producer.
-        for release_range in self._release_ranges:
-            assert release_range.end is not None
-
-            start, end = release_range.start, release_range.end
-            if start <= self._counter < end:
-                token = release_range.tokens[self._counter - start]
-                break
-        else:
-            token = next(self._tokens)
-        self._counter += 1
-        return token
+        # If the next token was already looked up, return the eaten token,
+        # if not just go further on the given token producer.
+        if self._lookahead:
+            return self._lookahead.popleft()
+
+        return next(self._tokens)
 
     def can_advance(self, to: int) -> bool:
         # Try to eat, fail if it can't. The eat operation is cached
@@ -135,7 +110,9 @@ class Driver(object):
         column = 0
         indent_columns: List[int] = []
         type = value = start = end = line_text = None
-        prefix = ""
+        # The parts of the prefix of the next token, joined only once it's complete so
+        # that long runs of comments don't take quadratic time.
+        prefix_parts: List[Text] = []
 
         for quintuple in proxy:
             type, value, start, end, line_text = quintuple
@@ -143,19 +120,21 @@ class Driver(object):
                 assert (lineno, column) <= start, ((lineno, column), start)
                 s_lineno, s_column = start
                 if lineno < s_lineno:
-                    prefix += "\n" * (s_lineno - lineno)
+                    prefix_parts.append("\n" * (s_lineno - lineno))
                     lineno = s_lineno
                     column = 0
                 if column < s_column:
-                    prefix += line_text[column:s_column]
+                    prefix_parts.append(line_text[column:s_column])
                     column = s_column
             if type in (tokenize.COMMENT, tokenize.NL):
-                prefix += value
+                prefix_parts.append(value)
                 lineno, column = end
                 if value.endswith("\n"):
                     lineno += 1
                     column = 0
                 continue
+            prefix = "".join(prefix_parts)
+            prefix_parts.clear()
             if type == token.OP:
                 type = grammar.opmap[value]
             if debug:
@@ -175,9 +154,8 @@ class Driver(object):
                 if debug:
                     self.logger.debug("Stop.")
                 break
-            prefix = ""
             if type in {token.INDENT, token.DEDENT}:
-                prefix = _prefix
+                prefix_parts.append(_prefix)
             lineno, column = end
             if value.endswith("\n"):
                 lineno += 1
@@ -185,6 +163,7 @@ class Driver(object):
         else:
             # We never broke out -- EOF is too soon (how can this happen???)
             assert start is not None
+            prefix = "".join(prefix_parts)
             raise parse.ParseError("incomplete input", type, value, (prefix, start))
         assert p.rootnode is not None
         return p.rootnode
@@ -213,31 +192,34 @@ class Driver(object):
         return self.parse_tokens(tokens, debug)
 
     def _partially_consume_prefix(self, prefix: Text, column: int) -> Tuple[Text, Text]:
-        lines: List[str] = []
-        current_line = ""
+        # The prefix is split after the last full line that is indented to at least
+        # `column`, or only consists of whitespace.  `consumed` is where the line
+        # being looked at starts.
+        consumed = 0
         current_column = 0
-        wait_for_nl = False
-        for char in prefix:
-            current_line += char
-            if wait_for_nl:
-                if char == "\n":
-                    if current_line.strip() and current_column < column:
-                        res = "".join(lines)
-                        return res, prefix[len(res) :]
-
-                    lines.append(current_line)
-                    current_line = ""
-                    current_column = 0
-                    wait_for_nl = False
-            elif char in " \t":
+        index = 0
+        while index < len(prefix):
+            char = prefix[index]
+            if char in " \t":
                 current_column += 1
             elif char == "\n":
                 # unexpected empty line
                 current_column = 0
             else:
                 # indent is finished
-                wait_for_nl = True
-        return "".join(lines), current_line
+                end = prefix.find("\n", index)
+                if end == -1:
+                    break
+
+                if prefix[consumed:end].strip() and current_column < column:
+                    break
+
+                consumed = index = end + 1
+                current_column = 0
+                continue
+
+            index += 1
+        return prefix[:consumed], prefix[consumed:]
 
 
 def _generate_pickle_name(gt: Path, cache_dir: Optional[Path] = None) -> Text:
@@ -128,6 +128,12 @@ class Grammar(object):
         """Load the grammar tables from a pickle bytes object."""
         self._update(pickle.loads(pkl))
 
+    def load_tables(self, tables: Dict[str, Any]) -> None:
+        """Load the grammar tables from a dictionary, like the ones generated
+        into the blib2to3._grammar_tables module.  They are used as they are,
+        so copy() the grammar before changing it."""
+        self._update(tables)
+
     def copy(self: _P) -> _P:
         """
         Copy the grammar.
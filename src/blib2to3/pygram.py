@@ -5,20 +5,15 @@
 
 # Python imports
 import os
-
-from typing import Union
+import sys
+from functools import lru_cache
+from typing import Any, Callable, Dict, Union
 
 # Local imports
-from .pgen2 import token
-from .pgen2 import driver
-
 from .pgen2.grammar import Grammar
 
-# Moved into initialize because mypyc can't handle __file__ (XXX bug)
-# # The grammar file
-# _GRAMMAR_FILE = os.path.join(os.path.dirname(__file__), "Grammar.txt")
-# _PATTERN_GRAMMAR_FILE = os.path.join(os.path.dirname(__file__),
-#                                      "PatternGrammar.txt")
+# The grammar tables are generated from Grammar.txt and PatternGrammar.txt by
+# scripts/generate_grammar_tables.py, see `initialize()`.
 
 
 class Symbols(object):
@@ -149,70 +144,139 @@ class _pattern_symbols(Symbols):
     Unit: int
 
 
-python_grammar: Grammar
+# Filled in by `initialize()`.
+python_grammar: Grammar = Grammar()
+pattern_grammar: Grammar = Grammar()
+
+python_symbols: _python_symbols
+pattern_symbols: _pattern_symbols
+
+# Soft keywords are only keywords in the Python 3.10+ grammar.
+_soft_keywords: Dict[str, int] = {}
+
+# The variants of the Python grammar, set when they're first derived.
 python_grammar_no_print_statement: Grammar
 python_grammar_no_print_statement_no_exec_statement: Grammar
 python_grammar_no_print_statement_no_exec_statement_async_keywords: Grammar
-python_grammar_no_exec_statement: Grammar
-pattern_grammar: Grammar
 python_grammar_soft_keywords: Grammar
 
-python_symbols: _python_symbols
-pattern_symbols: _pattern_symbols
+
+def _load_grammar(tables: Dict[str, Any]) -> Grammar:
+    grammar = Grammar()
+    grammar.load_tables(tables)
+    # The tables are shared with the generated module, so they're copied before the
+    # grammar is changed.
+    return grammar.copy()
 
 
 def initialize(cache_dir: Union[str, "os.PathLike[str]", None] = None) -> None:
+    """Load the Python and pattern grammars and their symbols.
+
+    On Python 3.7+, the variants of the Python grammar are only derived when first
+    requested, see `get_python_grammar_no_print_statement()` and the like.
+
+    `cache_dir` is ignored, the grammars aren't pickled anymore.
+    """
     global python_grammar
-    global python_grammar_no_print_statement
-    global python_grammar_no_print_statement_no_exec_statement
-    global python_grammar_no_print_statement_no_exec_statement_async_keywords
-    global python_grammar_soft_keywords
     global python_symbols
     global pattern_grammar
     global pattern_symbols
+    global _soft_keywords
 
-    # The grammar file
-    _GRAMMAR_FILE = os.path.join(os.path.dirname(__file__), "Grammar.txt")
-    _PATTERN_GRAMMAR_FILE = os.path.join(
-        os.path.dirname(__file__), "PatternGrammar.txt"
-    )
+    from ._grammar_tables import GRAMMAR, PATTERN_GRAMMAR
 
     # Python 2
-    python_grammar = driver.load_packaged_grammar("blib2to3", _GRAMMAR_FILE, cache_dir)
+    python_grammar = _load_grammar(GRAMMAR)
     python_grammar.version = (2, 0)
 
-    soft_keywords = python_grammar.soft_keywords.copy()
+    _soft_keywords = python_grammar.soft_keywords.copy()
     python_grammar.soft_keywords.clear()
 
     python_symbols = _python_symbols(python_grammar)
 
-    # Python 2 + from __future__ import print_function
-    python_grammar_no_print_statement = python_grammar.copy()
-    del python_grammar_no_print_statement.keywords["print"]
-
-    # Python 3.0-3.6
-    python_grammar_no_print_statement_no_exec_statement = python_grammar.copy()
-    del python_grammar_no_print_statement_no_exec_statement.keywords["print"]
-    del python_grammar_no_print_statement_no_exec_statement.keywords["exec"]
-    python_grammar_no_print_statement_no_exec_statement.version = (3, 0)
-
-    # Python 3.7+
-    python_grammar_no_print_statement_no_exec_statement_async_keywords = (
-        python_grammar_no_print_statement_no_exec_statement.copy()
-    )
-    python_grammar_no_print_statement_no_exec_statement_async_keywords.async_keywords = (
-        True
-    )
-    python_grammar_no_print_statement_no_exec_statement_async_keywords.version = (3, 7)
-
-    # Python 3.10+
-    python_grammar_soft_keywords = (
-        python_grammar_no_print_statement_no_exec_statement_async_keywords.copy()
-    )
-    python_grammar_soft_keywords.soft_keywords = soft_keywords
-    python_grammar_soft_keywords.version = (3, 10)
-
-    pattern_grammar = driver.load_packaged_grammar(
-        "blib2to3", _PATTERN_GRAMMAR_FILE, cache_dir
-    )
+    pattern_grammar = _load_grammar(PATTERN_GRAMMAR)
     pattern_symbols = _pattern_symbols(pattern_grammar)
+
+    for getter in (
+        get_python_grammar_no_print_statement,
+        get_python3_grammar,
+        get_python37_grammar,
+        get_python310_grammar,
+    ):
+        getter.cache_clear()
+
+    for name, get_grammar in _DERIVED_GRAMMARS.items():
+        if sys.version_info >= (3, 7):
+            # Derived again by `__getattr__()` when first accessed.
+            globals().pop(name, None)
+        else:
+            get_grammar()
+
+
+@lru_cache()
+def get_python_grammar_no_print_statement() -> Grammar:
+    """Python 2 + from __future__ import print_function: `print` isn't a keyword."""
+    global python_grammar_no_print_statement
+
+    grammar = python_grammar.copy()
+    del grammar.keywords["print"]
+    python_grammar_no_print_statement = grammar
+    return grammar
+
+
+@lru_cache()
+def get_python3_grammar() -> Grammar:
+    """Python 3.0-3.6: neither `print` nor `exec` are keywords."""
+    global python_grammar_no_print_statement_no_exec_statement
+
+    grammar = python_grammar.copy()
+    del grammar.keywords["print"]
+    del grammar.keywords["exec"]
+    grammar.version = (3, 0)
+    python_grammar_no_print_statement_no_exec_statement = grammar
+    return grammar
+
+
+@lru_cache()
+def get_python37_grammar() -> Grammar:
+    """Python 3.7+: `async` and `await` are keywords."""
+    global python_grammar_no_print_statement_no_exec_statement_async_keywords
+
+    grammar = get_python3_grammar().copy()
+    grammar.async_keywords = True
+    grammar.version = (3, 7)
+    python_grammar_no_print_statement_no_exec_statement_async_keywords = grammar
+    return grammar
+
+
+@lru_cache()
+def get_python310_grammar() -> Grammar:
+    """Python 3.10+: `match` and `case` are soft keywords."""
+    global python_grammar_soft_keywords
+
+    grammar = get_python37_grammar().copy()
+    grammar.soft_keywords = _soft_keywords
+    grammar.version = (3, 10)
+    python_grammar_soft_keywords = grammar
+    return grammar
+
+
+# The old names of the variants of the Python grammar.
+_DERIVED_GRAMMARS: Dict[str, Callable[[], Grammar]] = {
+    "python_grammar_no_print_statement": get_python_grammar_no_print_statement,
+    "python_grammar_no_print_statement_no_exec_statement": get_python3_grammar,
+    "python_grammar_no_print_statement_no_exec_statement_async_keywords": (
+        get_python37_grammar
+    ),
+    "python_grammar_soft_keywords": get_python310_grammar,
+}
+
+
+def __getattr__(name: str) -> Grammar:
+    """Derive the variants of the Python grammar under their old names (Python 3.7+)."""
+    try:
+        get_grammar = _DERIVED_GRAMMARS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    return get_grammar()
@@ -69,12 +69,17 @@ class Base(object):
     A node may be a subnode of at most one parent.
     """
 
-    # Default values for instance variables
+    # Trees of large files have hundreds of thousands of nodes and leaves, so
+    # they use slots instead of a dict per instance.  The subclasses set the
+    # initial values in __init__.
+    __slots__ = ("type", "parent", "children", "was_changed", "was_checked", "_index")
+
     type: int  # int: token number (< 256) or symbol number (>= 256)
-    parent: Optional["Node"] = None  # Parent node pointer, or None
+    parent: Optional["Node"]  # Parent node pointer, or None
     children: List[NL]  # List of subnodes
-    was_changed: bool = False
-    was_checked: bool = False
+    was_changed: bool
+    was_checked: bool
+    _index: int  # Position in the parent's children, see Node._valid_indexes
 
     def __new__(cls, *args, **kwds):
         """Constructor that prevents Base from being instantiated."""
@@ -139,11 +144,13 @@ class Base(object):
         assert new is not None
         if not isinstance(new, list):
             new = [new]
-        l_children = []
+        l_children: List[NL] = []
         found = False
+        start = 0
         for ch in self.parent.children:
             if ch is self:
                 assert not found, (self.parent.children, self, new)
+                start = len(l_children)
                 if new is not None:
                     l_children.extend(new)
                 found = True
@@ -152,7 +159,7 @@ class Base(object):
         assert found, (self.children, self, new)
         self.parent.children = l_children
         self.parent.changed()
-        self.parent.invalidate_sibling_maps()
+        self.parent.invalidate_indexes(start)
         for x in new:
             x.parent = self.parent
         self.parent = None
@@ -179,13 +186,44 @@ class Base(object):
         parent's children before it was removed.
         """
         if self.parent:
-            for i, node in enumerate(self.parent.children):
-                if node is self:
-                    del self.parent.children[i]
-                    self.parent.changed()
-                    self.parent.invalidate_sibling_maps()
-                    self.parent = None
-                    return i
+            i = self.sibling_index()
+            if i is not None:
+                del self.parent.children[i]
+                self.parent.changed()
+                self.parent.invalidate_indexes(i)
+                self.parent = None
+                return i
+        return None
+
+    def sibling_index(self) -> Optional[int]:
+        """
+        Return the position of the invocant in its parent's children list, or
+        None if it doesn't have a parent.
+        """
+        parent = self.parent
+        if parent is None:
+            return None
+
+        i = self._index
+        siblings = parent.children
+        if i < len(siblings) and siblings[i] is self:
+            return i
+
+        # Renumber the children after the first change, but only up to the
+        # invocant: the following ones might change again before they're needed.
+        for i in range(parent._valid_indexes, len(siblings)):
+            sibling = siblings[i]
+            sibling._index = i
+            if sibling is self:
+                parent._valid_indexes = i + 1
+                return i
+
+        # The list was changed without going through the methods of Node.
+        parent.renumber_children()
+        i = self._index
+        if i < len(siblings) and siblings[i] is self:
+            return i
+
         return None
 
     @property
@@ -194,13 +232,13 @@ class Base(object):
         The node immediately following the invocant in their parent's children
         list. If the invocant does not have a next sibling, it is None
         """
-        if self.parent is None:
+        i = self.sibling_index()
+        if i is None:
             return None
 
-        if self.parent.next_sibling_map is None:
-            self.parent.update_sibling_maps()
-        assert self.parent.next_sibling_map is not None
-        return self.parent.next_sibling_map[id(self)]
+        assert self.parent is not None
+        siblings = self.parent.children
+        return siblings[i + 1] if i + 1 < len(siblings) else None
 
     @property
     def prev_sibling(self) -> Optional[NL]:
@@ -208,17 +246,26 @@ class Base(object):
         The node immediately preceding the invocant in their parent's children
         list. If the invocant does not have a previous sibling, it is None.
         """
-        if self.parent is None:
+        i = self.sibling_index()
+        if not i:
             return None
 
-        if self.parent.prev_sibling_map is None:
-            self.parent.update_sibling_maps()
-        assert self.parent.prev_sibling_map is not None
-        return self.parent.prev_sibling_map[id(self)]
+        assert self.parent is not None
+        return self.parent.children[i - 1]
 
     def leaves(self) -> Iterator["Leaf"]:
-        for child in self.children:
-            yield from child.leaves()
+        # Like the traversals in Node, this keeps its own stack instead of
+        # recursing, so that a leaf isn't passed up through a generator per level.
+        stack = [iter(self.children)]
+        while stack:
+            for child in stack[-1]:
+                if isinstance(child, Leaf):
+                    yield child
+                else:
+                    stack.append(iter(child.children))
+                    break
+            else:
+                stack.pop()
 
     def depth(self) -> int:
         if self.parent is None:
@@ -241,8 +288,14 @@ class Node(Base):
 
     """Concrete implementation for interior nodes."""
 
+    __slots__ = ("fixers_applied", "used_names", "_valid_indexes")
+
     fixers_applied: Optional[List[Any]]
     used_names: Optional[Set[Text]]
+    # The number of children at the start whose `_index` is known to be right.
+    # Changing the children only lowers it, the indexes after it are updated
+    # when they're looked up.
+    _valid_indexes: int
 
     def __init__(
         self,
@@ -262,11 +315,16 @@ class Node(Base):
         """
         assert type >= 256, type
         self.type = type
+        self.parent = None
+        self.was_changed = False
+        self.was_checked = False
+        self._index = 0
         self.children = list(children)
-        for ch in self.children:
+        for i, ch in enumerate(self.children):
             assert ch.parent is None, repr(ch)
             ch.parent = self
-        self.invalidate_sibling_maps()
+            ch._index = i
+        self._valid_indexes = len(self.children)
         if prefix is not None:
             self.prefix = prefix
         if fixers_applied:
@@ -306,15 +364,33 @@ class Node(Base):
 
     def post_order(self) -> Iterator[NL]:
         """Return a post-order iterator for the tree."""
-        for child in self.children:
-            yield from child.post_order()
-        yield self
+        # The stack holds the nodes being visited with an iterator over their
+        # remaining children.  Iterating over the lists themselves sees changes
+        # made to them during the traversal, just like a recursive walk would.
+        stack: List[Tuple[NL, Iterator[NL]]] = [(self, iter(self.children))]
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                if child.children:
+                    stack.append((child, iter(child.children)))
+                    break
+                yield child
+            else:
+                stack.pop()
+                yield node
 
     def pre_order(self) -> Iterator[NL]:
         """Return a pre-order iterator for the tree."""
         yield self
-        for child in self.children:
-            yield from child.pre_order()
+        stack = [iter(self.children)]
+        while stack:
+            for child in stack[-1]:
+                yield child
+                if child.children:
+                    stack.append(iter(child.children))
+                    break
+            else:
+                stack.pop()
 
     @property
     def prefix(self) -> Text:
@@ -338,8 +414,8 @@ class Node(Base):
         child.parent = self
         self.children[i].parent = None
         self.children[i] = child
+        child._index = i if i >= 0 else i + len(self.children)
         self.changed()
-        self.invalidate_sibling_maps()
 
     def insert_child(self, i: int, child: NL) -> None:
         """
@@ -349,7 +425,7 @@ class Node(Base):
         child.parent = self
         self.children.insert(i, child)
         self.changed()
-        self.invalidate_sibling_maps()
+        self.invalidate_indexes(min(i, len(self.children) - 1) if i >= 0 else 0)
 
     def append_child(self, child: NL) -> None:
         """
@@ -358,40 +434,45 @@ class Node(Base):
         """
         child.parent = self
         self.children.append(child)
+        child._index = len(self.children) - 1
         self.changed()
-        self.invalidate_sibling_maps()
 
-    def invalidate_sibling_maps(self) -> None:
-        self.prev_sibling_map: Optional[Dict[int, Optional[NL]]] = None
-        self.next_sibling_map: Optional[Dict[int, Optional[NL]]] = None
+    def invalidate_indexes(self, start: int) -> None:
+        """Note that the children from index `start` onwards might have moved."""
+        self._valid_indexes = min(self._valid_indexes, start)
 
-    def update_sibling_maps(self) -> None:
-        _prev: Dict[int, Optional[NL]] = {}
-        _next: Dict[int, Optional[NL]] = {}
-        self.prev_sibling_map = _prev
-        self.next_sibling_map = _next
-        previous: Optional[NL] = None
-        for current in self.children:
-            _prev[id(current)] = previous
-            _next[id(previous)] = current
-            previous = current
-        _next[id(current)] = None
+    def renumber_children(self) -> None:
+        """Update the positions of all children."""
+        children = self.children
+        for i, child in enumerate(children):
+            child._index = i
+        self._valid_indexes = len(children)
 
 
 class Leaf(Base):
 
     """Concrete implementation for leaf nodes."""
 
-    # Default values for instance variables
+    __slots__ = (
+        "value",
+        "fixers_applied",
+        "bracket_depth",
+        "opening_bracket",
+        "used_names",
+        "_prefix",
+        "lineno",
+        "column",
+    )
+
     value: Text
     fixers_applied: List[Any]
+    # Set later in brackets.py
     bracket_depth: int
-    # Changed later in brackets.py
-    opening_bracket: Optional["Leaf"] = None
+    opening_bracket: Optional["Leaf"]
     used_names: Optional[Set[Text]]
-    _prefix = ""  # Whitespace and comments preceding this token in the input
-    lineno: int = 0  # Line where this token starts in the input
-    column: int = 0  # Column where this token starts in the input
+    _prefix: Text  # Whitespace and comments preceding this token in the input
+    lineno: int  # Line where this token starts in the input
+    column: int  # Column where this token starts in the input
 
     def __init__(
         self,
@@ -412,11 +493,19 @@ class Leaf(Base):
         assert 0 <= type < 256, type
         if context is not None:
             self._prefix, (self.lineno, self.column) = context
+        else:
+            self._prefix = ""
+            self.lineno = 0
+            self.column = 0
         self.type = type
+        self.parent = None
+        self.was_changed = False
+        self.was_checked = False
+        self._index = 0
         self.value = value
         if prefix is not None:
             self._prefix = prefix
-        self.fixers_applied: Optional[List[Any]] = fixers_applied[:]
+        self.fixers_applied = fixers_applied[:]
         self.children = []
         self.opening_bracket = opening_bracket
 
@@ -4,13 +4,15 @@ import asyncio
 import inspect
 import io
 import logging
-import multiprocessing
 import os
+import sqlite3
+import subprocess
 import sys
+import threading
 import types
 import unittest
 from concurrent.futures import ThreadPoolExecutor
-from contextlib import contextmanager, redirect_stderr
+from contextlib import closing, contextmanager, redirect_stderr
 from dataclasses import replace
 from io import BytesIO
 from pathlib import Path
@@ -24,6 +26,7 @@ from typing import (
     List,
     Optional,
     Sequence,
+    Type,
     TypeVar,
     Union,
 )
@@ -40,10 +43,20 @@ import blackish
 import blackish.files
 from blackish import Feature, TargetVersion
 from blackish import re_compile_maybe_verbose as compile_pattern
-from blackish.cache import get_cache_dir, get_cache_file
+from blackish.cache import get_cache_dir, get_cache_file, get_cache_db, get_cache_store
+from blackish.cache import Cache, CacheStats, CacheStore, PickleCacheStore
+from blackish.cache import SqliteCacheStore, get_cache_info
+from blackish.cache import export_cache, get_file_hash, get_shared_cache_dir
+from blackish.cache import SourceInfo, get_shared_cache_file
+from blackish.comments import convert_one_fmt_off_pair, normalize_fmt_off
 from blackish.debug import DebugVisitor
 from blackish.output import color_diff, diff
+from blackish.parsing import TokenBuffer, scan_grammar_signals
 from blackish.report import Report
+from blib2to3 import pygram
+from blib2to3.pgen2 import driver, pgen, token
+from blib2to3.pgen2.tokenize import TokenError
+from blib2to3.pytree import Leaf, Node
 
 # Import other test classes
 from tests.util import (
@@ -714,6 +727,225 @@ class BlackTestCase(BlackBaseTestCase):
         blackish.lib2to3_parse(py3_only)
         blackish.lib2to3_parse(py3_only, {TargetVersion.PY36})
 
+    def test_lib2to3_parse_grammar_signals(self) -> None:
+        cases = {
+            "match x:\n    case 1:\n        pass\n": pygram.get_python310_grammar(),
+            "async = 1\nprint(await)\n": pygram.get_python3_grammar(),
+        }
+        for src, grammar in cases.items():
+            with patch(
+                "blackish.parsing.driver.Driver", wraps=driver.Driver
+            ) as mock_driver:
+                blackish.lib2to3_parse(src)
+            mock_driver.assert_called_once_with(grammar)
+
+        # Grammars that can't parse the code are still tried last.
+        with patch("blackish.parsing.driver.Driver", wraps=driver.Driver) as drv:
+            with self.assertRaises(blackish.InvalidInput):
+                blackish.lib2to3_parse(
+                    "async = 1\nmatch x:\n    case 1:\n        pass\n"
+                )
+        # ... and two more times to look for Python 2 code.
+        assert drv.call_count == 5
+
+        assert scan_grammar_signals("match = re.match(x)\n") == (False, False)
+        assert scan_grammar_signals("match.group(1)\n") == (False, False)
+        assert scan_grammar_signals("match[0] = 1\n") == (False, False)
+        assert scan_grammar_signals("def f(async=1): ...\n") == (True, False)
+        assert scan_grammar_signals("async def f():\n    await x\n") == (False, False)
+
+    def test_lib2to3_parse_grammar_version(self) -> None:
+        src = "async = 1\n"
+        _, grammar = blackish.parse_with_grammar(src)
+        assert grammar is pygram.get_python3_grammar()
+        for version in (grammar.version, pygram.get_python37_grammar().version):
+            with patch("blackish.parsing.scan_grammar_signals") as scan:
+                node = blackish.lib2to3_parse(src, grammar_version=version)
+            assert str(node) == src
+            scan.assert_not_called()
+
+    def test_lib2to3_parse_reuses_tokens(self) -> None:
+        generate_tokens = blackish.parsing.tokenize.generate_tokens
+        with patch(
+            "blackish.parsing.tokenize.generate_tokens", wraps=generate_tokens
+        ) as mock_generate_tokens:
+            blackish.lib2to3_parse("async = 1\n")
+            # Once for the scan and the grammar without async keywords.
+            assert mock_generate_tokens.call_count == 1
+            mock_generate_tokens.reset_mock()
+            with self.assertRaises(blackish.InvalidInput):
+                blackish.lib2to3_parse("print 'daylily'\nx = (\n")
+            # Once with async keywords, and once without for the other grammars.
+            assert mock_generate_tokens.call_count == 2
+
+    def test_token_buffer(self) -> None:
+        def tokens() -> Iterator[int]:
+            yield 1
+            yield 2
+            raise TokenError("boom", (1, 0))
+
+        buffer = TokenBuffer(tokens)  # type: ignore[arg-type]
+        first = iter(buffer)
+        assert next(first) == 1
+        second = iter(buffer)
+        assert [next(second), next(second)] == [1, 2]
+        assert next(first) == 2
+        for replay in (first, second, iter(buffer)):
+            with pytest.raises(TokenError, match="boom"):
+                list(replay)
+
+    def test_token_buffer_limit(self) -> None:
+        calls = []
+
+        def numbers() -> Iterator[int]:
+            calls.append(None)
+            yield from range(5)
+
+        buffer = TokenBuffer(numbers, limit=2)  # type: ignore[arg-type]
+        first = iter(buffer)
+        assert [next(first), next(first)] == [0, 1]
+        second = iter(buffer)
+        assert next(second) == 0
+        # Past the limit, the tokens of the first replay aren't kept...
+        assert list(first) == [2, 3, 4]
+        assert len(calls) == 1
+        # ... so the others generate them again.
+        assert list(second) == [1, 2, 3, 4]
+        assert list(buffer) == [0, 1, 2, 3, 4]
+        assert len(calls) == 3
+
+    def test_token_proxy(self) -> None:
+        proxy = driver.TokenProxy(iter(range(5)))
+        assert next(proxy) == 0
+        with proxy.release() as lookahead:
+            assert [lookahead.eat(0), lookahead.eat(2)] == [1, 3]
+        assert next(proxy) == 1
+        # Looking ahead again starts at the next token, even if some of the
+        # tokens after it were already eaten.
+        with proxy.release() as lookahead:
+            assert [lookahead.eat(0), lookahead.eat(2)] == [2, 4]
+            assert not lookahead.can_advance(3)
+        assert list(proxy) == [2, 3, 4]
+
+    def test_tree_traversal_order(self) -> None:
+        node = blackish.lib2to3_parse("f(a, [b])\n")
+        names = [str(n).strip() for n in node.pre_order()]
+        assert names[:4] == ["f(a, [b])", "f(a, [b])", "f(a, [b])", "f"]
+        assert names.index("a, [b]") < names.index("[b]") < names.index("b")
+        post = [str(n).strip() for n in node.post_order()]
+        assert post.index("b") < post.index("[b]") < post.index("a, [b]")
+        assert post[-1] == names[0]
+        assert [leaf.value for leaf in node.leaves()] == [
+            "f",
+            "(",
+            "a",
+            ",",
+            "[",
+            "b",
+            "]",
+            ")",
+            "\n",
+            "",
+        ]
+        # Children appended during the walk are still visited.
+        walked = []
+        for n in node.pre_order():
+            walked.append(n)
+            if isinstance(n, Leaf) and n.value == "b":
+                assert n.parent is not None
+                n.parent.append_child(Leaf(token.NAME, "c"))
+        assert any(isinstance(n, Leaf) and n.value == "c" for n in walked)
+
+    def test_sibling_index(self) -> None:
+        call = blackish.lib2to3_parse("f(a, b)\n").children[0].children[0]
+        arglist = call.children[1].children[1]
+        assert isinstance(arglist, Node)
+
+        def check(*values: str) -> None:
+            children = arglist.children
+            assert [str(child) for child in children] == list(values)
+            for i, child in enumerate(children):
+                assert child.prev_sibling is (children[i - 1] if i else None)
+                after = children[i + 1] if i + 1 < len(children) else None
+                assert child.next_sibling is after
+
+        check("a", ",", " b")
+        b = arglist.children[-1]
+        arglist.insert_child(-1, Leaf(token.NAME, "c"))
+        check("a", ",", "c", " b")
+        arglist.set_child(-1, Leaf(token.NAME, "d"))
+        check("a", ",", "c", "d")
+        assert b.parent is None and b.next_sibling is None
+        assert arglist.children[1].remove() == 1
+        check("a", "c", "d")
+        arglist.children[1].replace([Leaf(token.COMMA, ","), Leaf(token.NAME, "e")])
+        check("a", ",", "e", "d")
+        arglist.append_child(Leaf(token.NAME, "g"))
+        check("a", ",", "e", "d", "g")
+        # Changes made to the list directly are picked up too.
+        arglist.children.reverse()
+        check("g", "d", "e", ",", "a")
+
+    def test_tree_has_no_instance_dicts(self) -> None:
+        node = blackish.lib2to3_parse("x = [1]\n")
+        for child in node.pre_order():
+            assert not hasattr(child, "__dict__"), child
+        # Attributes set during formatting need a slot too.
+        leaf = next(node.leaves())
+        leaf.bracket_depth = 0
+        with self.assertRaises(AttributeError):
+            leaf.typo = 0  # type: ignore[attr-defined]
+
+    def test_grammar_tables_are_up_to_date(self) -> None:
+        # Run scripts/generate_grammar_tables.py if this fails.
+        from blib2to3._grammar_tables import GRAMMAR, PATTERN_GRAMMAR
+
+        blib2to3_dir = PROJECT_ROOT / "src" / "blib2to3"
+        for name, tables in (
+            ("Grammar.txt", GRAMMAR),
+            ("PatternGrammar.txt", PATTERN_GRAMMAR),
+        ):
+            grammar = pgen.generate_grammar(blib2to3_dir / name)
+            self.assertEqual(tables, grammar.__dict__)
+
+    def test_grammar_variants(self) -> None:
+        grammar = pygram.get_python310_grammar()
+        self.assertIs(grammar, pygram.get_python310_grammar())
+        self.assertEqual(grammar.version, (3, 10))
+        self.assertTrue(grammar.async_keywords)
+        self.assertIn("match", grammar.soft_keywords)
+        self.assertNotIn("print", grammar.keywords)
+        self.assertEqual(pygram.python_grammar.soft_keywords, {})
+        self.assertIn("print", pygram.python_grammar.keywords)
+        # The old names of the variants still work.
+        self.assertIs(pygram.python_grammar_soft_keywords, grammar)
+        self.assertIs(
+            pygram.python_grammar_no_print_statement_no_exec_statement,
+            pygram.get_python3_grammar(),
+        )
+        with self.assertRaises(AttributeError):
+            pygram.python_grammar_typo
+
+    def test_grammar_variants_attributes(self) -> None:
+        # Without module level __getattr__ the variants are derived right away.
+        with patch("sys.version_info", (3, 6, 15, "final", 0)):
+            pygram.initialize()
+        try:
+            self.assertIs(
+                vars(pygram)["python_grammar_soft_keywords"],
+                pygram.get_python310_grammar(),
+            )
+        finally:
+            pygram.initialize()
+        self.assertNotIn("python_grammar_soft_keywords", vars(pygram))
+        grammar = pygram.get_python37_grammar()
+        self.assertIs(
+            vars(pygram)[
+                "python_grammar_no_print_statement_no_exec_statement_async_keywords"
+            ],
+            grammar,
+        )
+
     def test_get_features_used_decorator(self) -> None:
         # Test the feature detection of new decorator syntax
         # since this makes some test cases of test_get_features_used()
@@ -876,6 +1108,40 @@ class BlackTestCase(BlackBaseTestCase):
             {"unicode_literals", "print"}, blackish.get_future_imports(node)
         )
 
+    def test_analyze_tree(self) -> None:
+        src = (
+            "from __future__ import annotations\n"
+            "x = 1_000  # fmt: skip\n"
+            "# fmt: off\n"
+            "y  =  (a := 2)\n"
+            "# fmt: on\n"
+        )
+        node = blackish.lib2to3_parse(src)
+        analysis = blackish.analyze_tree(node, mode=DEFAULT_MODE)
+        self.assertEqual(analysis.future_imports, {"annotations"})
+        self.assertEqual(analysis.versions, blackish.detect_target_versions(node))
+        self.assertEqual([leaf.value for leaf in analysis.fmt_pass_leaves], ["\n", "y"])
+
+        mode = replace(DEFAULT_MODE, target_versions={TargetVersion.PY310})
+        analysis = blackish.analyze_tree(node, mode=mode)
+        self.assertEqual(analysis.versions, {TargetVersion.PY310})
+
+    def test_normalize_fmt_off_in_one_pass(self) -> None:
+        src = "".join(
+            f"# fmt: off\nx{i} = [1,  2]\nz{i} = 3\n# fmt: on\ny{i} = 1  # fmt: skip\n"
+            for i in range(3)
+        )
+        expected = blackish.lib2to3_parse(src)
+        while convert_one_fmt_off_pair(expected, preview=False):
+            pass
+
+        node = blackish.lib2to3_parse(src)
+        with patch("blackish.comments.convert_one_fmt_off_pair") as convert:
+            normalize_fmt_off(node, preview=False)
+        convert.assert_not_called()
+        self.assertEqual(repr(node), repr(expected))
+        self.assertEqual(str(node), str(expected))
+
     @pytest.mark.incompatible_with_mypyc
     def test_debug_visitor(self) -> None:
         source, _ = read_data("miscellaneous", "debug_visitor")
@@ -948,6 +1214,21 @@ class BlackTestCase(BlackBaseTestCase):
         self.assertIn("Actual tree:", out_str)
         self.assertEqual("".join(err_lines), "")
 
+    def test_single_big_file_formatted_in_parallel(self) -> None:
+        source, expected = read_data("simple_cases", "function")
+        with cache_dir() as workspace, patch(
+            "concurrent.futures.ProcessPoolExecutor", new=ThreadPoolExecutor
+        ), patch("blackish.PARALLEL_FILE_SIZE", 0), patch(
+            "blackish.PARALLEL_GROUP_SIZE", 1
+        ), patch(
+            "blackish.format_statement_group", wraps=blackish.format_statement_group
+        ) as format_group:
+            src = workspace / "function.py"
+            src.write_text(source)
+            self.invokeBlack([str(src), "--workers", "2"])
+            assert src.read_text() == expected
+            assert format_group.call_count > 1
+
     @event_loop()
     @patch("concurrent.futures.ProcessPoolExecutor", MagicMock(side_effect=OSError))
     def test_works_in_mono_process_only_environment(self) -> None:
@@ -959,6 +1240,95 @@ class BlackTestCase(BlackBaseTestCase):
                 f.write_text('print("hello")\n')
             self.invokeBlack([str(workspace)])
 
+    def test_single_big_file_reuses_worker_pool(self) -> None:
+        source, expected = read_data("simple_cases", "function")
+        with cache_dir() as workspace, patch("blackish.PARALLEL_FILE_SIZE", 0), patch(
+            "blackish.PARALLEL_GROUP_SIZE", 1
+        ), patch(
+            "blackish.format_statement_group", wraps=blackish.format_statement_group
+        ) as format_group, patch(
+            "blackish.start_worker_pool"
+        ) as start_worker_pool, ThreadPoolExecutor(
+            max_workers=2
+        ) as executor:
+            src = (workspace / "function.py").resolve()
+            src.write_text(source)
+            report = blackish.Report()
+            blackish.reformat_one(
+                src,
+                False,
+                blackish.WriteBack.YES,
+                DEFAULT_MODE,
+                report,
+                workers=2,
+                executor=executor,
+            )
+            assert report.change_count == 1
+            assert src.read_text() == expected
+            assert format_group.call_count > 1
+            # Every group is parsed with the grammar that parsed the whole file.
+            assert {call[0][4] for call in format_group.call_args_list} == {(3, 7)}
+            start_worker_pool.assert_not_called()
+
+    def test_start_worker_pool(self) -> None:
+        def process_pool_36(max_workers: int) -> ThreadPoolExecutor:
+            # Python 3.6 doesn't take an initializer.
+            return ThreadPoolExecutor(max_workers=max_workers)
+
+        with patch("concurrent.futures.ProcessPoolExecutor", process_pool_36), patch(
+            "sys.version_info", (3, 6, 15, "final", 0)
+        ):
+            executor, worker_count = blackish.start_worker_pool(2)
+        with executor:
+            assert worker_count == 2
+            assert executor.submit(len, "abc").result() == 3
+        with patch("concurrent.futures.ProcessPoolExecutor") as process_pool, patch(
+            "sys.version_info", (3, 7, 0, "final", 0)
+        ):
+            assert blackish.start_worker_pool(2)[1] == 2
+        process_pool.assert_called_once_with(
+            max_workers=2, initializer=blackish.initialize_worker
+        )
+
+    @event_loop()
+    @patch("concurrent.futures.ProcessPoolExecutor", MagicMock(side_effect=OSError))
+    def test_mono_process_fallback_uses_a_single_worker(self) -> None:
+        with cache_dir() as workspace, patch("blackish.PARALLEL_FILE_SIZE", 0), patch(
+            "blackish.format_statement_group", wraps=blackish.format_statement_group
+        ) as format_group, patch(
+            "blackish.batch_by_size", wraps=blackish.batch_by_size
+        ) as batch_by_size:
+            one = (workspace / "one.py").resolve()
+            two = (workspace / "two.py").resolve()
+            for src in (one, two):
+                src.write_text("print('hello')\n")
+            self.invokeBlack([str(one), "--workers", "4"])
+            assert one.read_text() == 'print("hello")\n'
+            format_group.assert_not_called()
+            self.invokeBlack([str(workspace), "--workers", "4"])
+            assert two.read_text() == 'print("hello")\n'
+            assert batch_by_size.call_args[0][2] == 1
+
+    def test_reformat_many_reuses_worker_pool(self) -> None:
+        with cache_dir() as workspace, blackish.new_worker_pool(2) as pool:
+            for name in ("one", "two"):
+                src = (workspace / f"{name}.py").resolve()
+                src.write_text("print('hello')")
+                report = blackish.Report()
+                blackish.reformat_many(
+                    {src},
+                    False,
+                    blackish.WriteBack.YES,
+                    DEFAULT_MODE,
+                    report,
+                    workers=2,
+                    executor=pool,
+                )
+                assert report.change_count == 1
+                assert src.read_text() == 'print("hello")\n'
+            # The pool is left running for the caller.
+            assert pool.submit(len, "abc").result() == 3
+
     @event_loop()
     def test_check_diff_use_together(self) -> None:
         with cache_dir():
@@ -1291,6 +1661,37 @@ class BlackTestCase(BlackBaseTestCase):
     def test_assert_equivalent_different_asts(self) -> None:
         with self.assertRaises(AssertionError):
             blackish.assert_equivalent("{}", "None")
+        with patch("blackish.dump_to_file", wraps=blackish.dump_to_file) as dump:
+            with self.assertRaises(AssertionError):
+                blackish.assert_equivalent("x", "x\ny")
+        diff_text = dump.call_args[0][0]
+        self.assertIn("+            'y',  # str\n", diff_text)
+
+    def test_import_is_lazy(self) -> None:
+        # Editor integrations run blackish on every save, so importing it shouldn't
+        # load what only some code paths need.
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import blackish"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            check=True,
+        )
+        imported = {
+            line.rpartition("|")[2].strip()
+            for line in result.stderr.splitlines()
+            if line.startswith("import time:")
+        }
+        self.assertIn("blackish", imported)
+        for module in (
+            "asyncio",
+            "concurrent.futures",
+            "multiprocessing",
+            "blackish.handle_ipynb_magics",
+            "tomllib",
+            "tomli",
+        ):
+            self.assertNotIn(module, imported)
 
     def test_shhh_click(self) -> None:
         try:
@@ -1734,6 +2135,69 @@ class TestCaching:
             assert str(one) in cache
             assert str(two) in cache
 
+    def test_order_by_size(self) -> None:
+        with TemporaryDirectory() as workspace:
+            path = Path(workspace)
+            small = path / "a.py"
+            small.write_text("x = 1\n")
+            big = path / "b.py"
+            big.write_text("x = 1\n" * 100)
+            same = path / "c.py"
+            same.write_text("y = 1\n")
+            missing = path / "d.py"
+            assert blackish.order_by_size({missing, same, small, big}, {}) == [
+                big,
+                small,
+                same,
+                missing,
+            ]
+            # Sizes seen during discovery are used without asking the file system.
+            infos = {small: SourceInfo(small.resolve(), big.stat())}
+            assert blackish.order_by_size([big, small, same], infos) == [
+                small,
+                big,
+                same,
+            ]
+
+    def test_batch_by_size(self) -> None:
+        with TemporaryDirectory() as workspace:
+            path = Path(workspace)
+            sources = []
+            for name, size in [("a", 600), ("b", 200), ("c", 150), ("d", 50), ("e", 0)]:
+                src = path / f"{name}.py"
+                src.write_text("#" * size)
+                sources.append(src)
+            a, b, c, d, e = sources
+            # 1000 bytes for one worker, in batches of at most 250 bytes.
+            assert blackish.batch_by_size(sources, {}, 1) == [[a], [b], [c, d, e]]
+            with patch("blackish.MAX_BATCH_SIZE", 100):
+                assert blackish.batch_by_size(sources, {}, 1) == [[a], [b], [c], [d, e]]
+            assert blackish.batch_by_size([], {}, 4) == []
+
+    def test_format_files(self) -> None:
+        with TemporaryDirectory() as workspace:
+            path = Path(workspace)
+            failing = path / "failing.py"
+            failing.write_text("not actually python")
+            dirty = path / "dirty.py"
+            dirty.write_text("print('hello')")
+            clean = path / "clean.py"
+            clean.write_text('print("hello")\n')
+            results = blackish.format_files(
+                [failing, dirty, clean], False, DEFAULT_MODE, blackish.WriteBack.DIFF
+            )
+            error = blackish.FormatError("Cannot parse: 1:13: not actually python")
+            assert results[0] == error
+            assert isinstance(results[1], blackish.FileDiff)
+            assert '+print("hello")' in results[1].contents
+            assert results[2] is False
+            assert dirty.read_text() == "print('hello')"
+            results = blackish.format_files(
+                [failing, dirty, clean], False, DEFAULT_MODE, blackish.WriteBack.YES
+            )
+            assert results == [error, True, False]
+            assert dirty.read_text() == 'print("hello")\n'
+
     @pytest.mark.parametrize("color", [False, True], ids=["no-color", "with-color"])
     def test_no_cache_when_writeback_diff(self, color: bool) -> None:
         mode = DEFAULT_MODE
@@ -1755,20 +2219,58 @@ class TestCaching:
 
     @pytest.mark.parametrize("color", [False, True], ids=["no-color", "with-color"])
     @event_loop()
-    def test_output_locking_when_writeback_diff(self, color: bool) -> None:
+    def test_output_order_when_writeback_diff(self, color: bool) -> None:
         with cache_dir() as workspace:
+            srcs = []
             for tag in range(0, 4):
                 src = (workspace / f"test{tag}.py").resolve()
                 with src.open("w") as fobj:
-                    fobj.write("print('hello')")
-            with patch("blackish.Manager", wraps=multiprocessing.Manager) as mgr:
-                cmd = ["--diff", str(workspace)]
-                if color:
-                    cmd.append("--color")
-                invokeBlack(cmd, exit_code=0)
-                # this isn't quite doing what we want, but if it _isn't_
-                # called then we cannot be using the lock it provides
-                mgr.assert_called()
+                    # Make the first files the biggest, so they're scheduled first.
+                    fobj.write("print('hello')\n" * (10 - tag))
+                srcs.append(src)
+            cmd = ["--diff", str(workspace), "--config", str(THIS_DIR / "empty.toml")]
+            if color:
+                cmd.append("--color")
+            # Workers hand their diffs over to the main process, which writes them
+            # out in order.
+            result = BlackRunner().invoke(blackish.main, cmd)
+            assert result.exit_code == 0, result.stderr
+            headers = [line for line in result.stdout.splitlines() if "+++ " in line]
+            assert len(headers) == 4
+            for header, src in zip(headers, srcs):
+                assert f"{src}\t" in header
+
+    def test_diffs_written_once_files_before_are_done(self) -> None:
+        with cache_dir() as workspace:
+            first = (workspace / "a.py").resolve()
+            first.write_text("print('hello')\n" * 10)
+            second = (workspace / "b.py").resolve()
+            second.write_text("print('hello')\n")
+            written = threading.Event()
+            waited = []
+            format_files = blackish.format_files
+
+            def format_after_first_diff(
+                sources: List[Path], *args: Any
+            ) -> List[Union[bool, blackish.FileDiff, blackish.FormatError]]:
+                if second in sources:
+                    waited.append(written.wait(timeout=5))
+                return format_files(sources, *args)
+
+            with patch("blackish.format_files", format_after_first_diff), patch.object(
+                blackish, "write_diff", side_effect=lambda diff: written.set()
+            ) as write_diff, ThreadPoolExecutor(max_workers=1) as executor:
+                blackish.reformat_many(
+                    {first, second},
+                    fast=False,
+                    write_back=blackish.WriteBack.DIFF,
+                    mode=DEFAULT_MODE,
+                    report=blackish.Report(),
+                    workers=1,
+                    executor=executor,
+                )
+            assert waited == [True]
+            assert write_diff.call_count == 2
 
     def test_no_cache_when_stdin(self) -> None:
         mode = DEFAULT_MODE
@@ -1793,7 +2295,7 @@ class TestCaching:
             blackish.write_cache({}, [src], mode)
             cache = blackish.read_cache(mode)
             assert str(src) in cache
-            assert cache[str(src)] == blackish.get_cache_info(src)
+            assert cache[str(src)] == get_cache_info(src)
 
     def test_filter_cached(self) -> None:
         with TemporaryDirectory() as workspace:
@@ -1804,8 +2306,8 @@ class TestCaching:
             uncached.touch()
             cached.touch()
             cached_but_changed.touch()
-            cache = {
-                str(cached): blackish.get_cache_info(cached),
+            cache: Cache = {
+                str(cached): get_cache_info(cached),
                 str(cached_but_changed): (0.0, 0),
             }
             todo, done = blackish.filter_cached(
@@ -1814,6 +2316,77 @@ class TestCaching:
             assert todo == {uncached, cached_but_changed}
             assert done == {cached}
 
+    def test_filter_cached_hash(self) -> None:
+        with TemporaryDirectory() as workspace:
+            path = Path(workspace)
+            src = (path / "test.py").resolve()
+            src.write_text("print('hello')")
+            st = src.stat()
+            cached_info = get_cache_info(src)
+            # Simulate a fresh checkout: same contents, different mtime.
+            os.utime(src, (st.st_atime, st.st_mtime - 1))
+            cache = {str(src): cached_info}
+            todo, done = blackish.filter_cached(cache, [src])
+            assert todo == set()
+            assert done == {src}
+            # Same size and a new mtime, but different contents.
+            src.write_text("print('world')")
+            todo, done = blackish.filter_cached(cache, [src])
+            assert todo == {src}
+            assert done == set()
+
+    def test_filter_cached_infos(self) -> None:
+        with TemporaryDirectory() as workspace:
+            path = Path(workspace)
+            src = path / "test.py"
+            src.write_text("print('hello')")
+            info = SourceInfo(src.resolve(), src.stat())
+            cache = {str(src.resolve()): get_cache_info(src)}
+            with patch.object(Path, "resolve") as resolve, patch.object(
+                Path, "stat"
+            ) as stat:
+                todo, done = blackish.filter_cached(cache, [src], {src: info})
+            resolve.assert_not_called()
+            stat.assert_not_called()
+            assert todo == set()
+            assert done == {src}
+
+    def test_filter_cached_legacy_entries(self) -> None:
+        with TemporaryDirectory() as workspace:
+            path = Path(workspace)
+            cached = (path / "cached").resolve()
+            touched = (path / "touched").resolve()
+            cached.touch()
+            touched.touch()
+            st = touched.stat()
+            # Entries written by older versions don't have a content digest.
+            cache = {
+                str(cached): get_cache_info(cached)[:2],
+                str(touched): (st.st_mtime - 1, st.st_size),
+            }
+            todo, done = blackish.filter_cached(cache, {cached, touched})
+            assert todo == {touched}
+            assert done == {cached}
+
+    @pytest.mark.parametrize("store", [PickleCacheStore, SqliteCacheStore])
+    def test_touch_cache_refreshes_mtime(self, store: Type[CacheStore]) -> None:
+        mode = DEFAULT_MODE
+        with cache_dir() as workspace, patch("blackish.cache.CACHE_STORE", store()):
+            src = (workspace / "test.py").resolve()
+            src.write_text("print('hello')")
+            blackish.write_cache({}, [src], mode)
+            # Simulate a fresh checkout: same contents, different mtime.
+            st = src.stat()
+            os.utime(src, (st.st_atime, st.st_mtime - 1))
+            cache = blackish.read_cache(mode)
+            assert blackish.filter_cached(cache, [src]) == (set(), {src})
+            blackish.touch_cache(cache, [src], mode)
+            cache = blackish.read_cache(mode)
+            assert cache[str(src)][0] == src.stat().st_mtime
+            with patch("blackish.cache.get_file_hash") as get_file_hash:
+                assert blackish.filter_cached(cache, [src]) == (set(), {src})
+            get_file_hash.assert_not_called()
+
     def test_write_cache_creates_directory_if_needed(self) -> None:
         mode = DEFAULT_MODE
         with cache_dir(exists=False) as workspace:
@@ -1844,6 +2417,252 @@ class TestCaching:
             mock.side_effect = OSError
             blackish.write_cache({}, [], mode)
 
+    def test_get_cache_store(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.delenv("BLACK_CACHE_BACKEND", raising=False)
+        assert isinstance(get_cache_store(), PickleCacheStore)
+        monkeypatch.setenv("BLACK_CACHE_BACKEND", "sqlite")
+        assert isinstance(get_cache_store(), SqliteCacheStore)
+        monkeypatch.setenv("BLACK_CACHE_BACKEND", "unknown")
+        assert isinstance(get_cache_store(), PickleCacheStore)
+
+    def test_sqlite_cache_write_read_cache(self) -> None:
+        mode = DEFAULT_MODE
+        short_mode = replace(DEFAULT_MODE, line_length=1)
+        with cache_dir() as workspace, patch(
+            "blackish.cache.CACHE_STORE", SqliteCacheStore()
+        ):
+            assert blackish.read_cache(mode) == {}
+            one = (workspace / "one.py").resolve()
+            two = (workspace / "two.py").resolve()
+            one.touch()
+            two.touch()
+            blackish.write_cache({}, [one, two], mode)
+            assert get_cache_db().exists()
+            cache = blackish.read_cache(mode)
+            assert cache == {
+                str(one): get_cache_info(one),
+                str(two): get_cache_info(two),
+            }
+            assert blackish.read_cache(mode, [two]) == {str(two): get_cache_info(two)}
+            assert blackish.read_cache(short_mode) == {}
+
+    def test_sqlite_cache_reads_dont_create_schema(self) -> None:
+        mode = DEFAULT_MODE
+        with cache_dir() as workspace, patch(
+            "blackish.cache.CACHE_STORE", SqliteCacheStore()
+        ):
+            src = (workspace / "test.py").resolve()
+            src.touch()
+            assert blackish.read_cache(mode) == {}
+            assert blackish.get_cache_stats() == []
+            assert not get_cache_db().exists()
+            # A database written by a version with an older schema.
+            with closing(sqlite3.connect(str(get_cache_db()))) as conn:
+                conn.execute("CREATE TABLE entries (path TEXT)")
+                conn.execute("PRAGMA user_version = 1")
+            cache = blackish.read_cache(mode)
+            assert cache == {}
+            blackish.touch_cache(cache, [src], mode)
+            assert blackish.get_cache_stats() == []
+            assert blackish.prune_cache() == []
+            with closing(sqlite3.connect(str(get_cache_db()))) as conn:
+                assert conn.execute("PRAGMA user_version").fetchone() == (1,)
+            blackish.write_cache(cache, [src], mode)
+            assert str(src) in blackish.read_cache(mode)
+
+    def test_sqlite_cache_keeps_concurrent_writes(self) -> None:
+        mode = DEFAULT_MODE
+        with cache_dir() as workspace, patch(
+            "blackish.cache.CACHE_STORE", SqliteCacheStore()
+        ):
+            one = (workspace / "one.py").resolve()
+            two = (workspace / "two.py").resolve()
+            one.touch()
+            two.touch()
+            # Both writers started from an empty cache; neither loses its entry.
+            blackish.write_cache({}, [one], mode)
+            blackish.write_cache({}, [two], mode)
+            cache = blackish.read_cache(mode)
+            assert str(one) in cache
+            assert str(two) in cache
+
+    @event_loop()
+    def test_sqlite_cache_multiple_files(self) -> None:
+        mode = DEFAULT_MODE
+        with cache_dir() as workspace, patch(
+            "blackish.cache.CACHE_STORE", SqliteCacheStore()
+        ), patch("concurrent.futures.ProcessPoolExecutor", new=ThreadPoolExecutor):
+            one = (workspace / "one.py").resolve()
+            one.write_text("print('hello')")
+            two = (workspace / "two.py").resolve()
+            two.write_text("print('hello')")
+            blackish.write_cache({}, [one], mode)
+            invokeBlack([str(workspace)])
+            assert one.read_text() == "print('hello')"
+            assert two.read_text() == 'print("hello")\n'
+            cache = blackish.read_cache(mode)
+            assert str(one) in cache
+            assert str(two) in cache
+
+    @pytest.mark.parametrize("store", [PickleCacheStore, SqliteCacheStore])
+    def test_prune_cache(self, store: Type[CacheStore]) -> None:
+        mode = DEFAULT_MODE
+        with cache_dir() as workspace, patch("blackish.cache.CACHE_STORE", store()):
+            paths = [(workspace / f"file{i}.py").resolve() for i in range(4)]
+            for path in paths:
+                path.touch()
+            blackish.write_cache({}, paths, mode)
+            cache = blackish.read_cache(mode)
+            with patch.object(store, "TOUCH_RESOLUTION", 0):
+                blackish.touch_cache(cache, paths[:1], mode)
+            paths[3].unlink()
+            (stats,) = blackish.prune_cache(max_entries=2)
+            assert stats.key == mode.get_cache_key()
+            assert (stats.entries, stats.missing, stats.evicted) == (2, 1, 1)
+            assert not stats.expired
+            cache = blackish.read_cache(mode)
+            assert str(paths[0]) in cache
+            assert str(paths[3]) not in cache
+            assert len(cache) == 2
+            assert blackish.get_cache_stats() == [
+                CacheStats(key=mode.get_cache_key(), entries=2, size=stats.size)
+            ]
+
+    @pytest.mark.parametrize("store", [PickleCacheStore, SqliteCacheStore])
+    def test_prune_cache_unused_mode(self, store: Type[CacheStore]) -> None:
+        mode = DEFAULT_MODE
+        with cache_dir() as workspace, patch("blackish.cache.CACHE_STORE", store()):
+            src = (workspace / "test.py").resolve()
+            src.touch()
+            blackish.write_cache({}, [src], mode)
+            with patch("blackish.cache.MAX_CACHE_AGE", -1):
+                (stats,) = blackish.prune_cache()
+            assert stats.expired
+            assert blackish.read_cache(mode) == {}
+            assert blackish.get_cache_stats() == []
+
+    def test_pickle_cache_evicts_least_recently_used(self) -> None:
+        mode = DEFAULT_MODE
+        with cache_dir() as workspace, patch("blackish.cache.MAX_CACHE_ENTRIES", 2):
+            one, two, three = [(workspace / f"{n}.py").resolve() for n in "abc"]
+            for path in (one, two, three):
+                path.touch()
+            blackish.write_cache({}, [one, two], mode)
+            cache = blackish.read_cache(mode)
+            blackish.touch_cache(cache, [one], mode)
+            # The file was just written, the new order is saved with the next write.
+            assert list(blackish.read_cache(mode)) == [str(one), str(two)]
+            with patch.object(PickleCacheStore, "TOUCH_RESOLUTION", 0):
+                blackish.touch_cache(cache, [one], mode)
+            assert list(blackish.read_cache(mode)) == [str(two), str(one)]
+            blackish.write_cache(cache, [three], mode)
+            assert list(blackish.read_cache(mode)) == [str(one), str(three)]
+
+    def test_sqlite_cache_evicts_least_recently_used(self) -> None:
+        mode = DEFAULT_MODE
+        with cache_dir() as workspace, patch(
+            "blackish.cache.CACHE_STORE", SqliteCacheStore()
+        ), patch("blackish.cache.MAX_CACHE_ENTRIES", 2):
+            one, two, three = [(workspace / f"{n}.py").resolve() for n in "abc"]
+            for path in (one, two, three):
+                path.touch()
+            blackish.write_cache({}, [one], mode)
+            blackish.write_cache({}, [two], mode)
+            cache = blackish.read_cache(mode)
+            blackish.write_cache(cache, [one], mode)
+            assert len(blackish.read_cache(mode)) == 2
+            blackish.write_cache(cache, [three], mode)
+            assert set(blackish.read_cache(mode)) == {str(one), str(three)}
+
+    def test_cache_stats_and_prune_options(self) -> None:
+        mode = DEFAULT_MODE
+        with cache_dir() as workspace:
+            src = (workspace / "test.py").resolve()
+            src.touch()
+            blackish.write_cache({}, [src], mode)
+            src.unlink()
+            runner = BlackRunner()
+            result = runner.invoke(blackish.main, ["--cache-stats"])
+            assert result.exit_code == 0
+            assert f"{mode.get_cache_key()}: 1 entries" in result.stderr
+            result = runner.invoke(blackish.main, ["--cache-prune"])
+            assert result.exit_code == 0
+            assert "removed 1 entries of missing files" in result.stderr
+            assert blackish.read_cache(mode) == {}
+
+    def test_get_shared_cache_dir(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.delenv("BLACK_SHARED_CACHE_DIR", raising=False)
+        assert get_shared_cache_dir() is None
+        monkeypatch.setenv("BLACK_SHARED_CACHE_DIR", str(tmp_path))
+        assert get_shared_cache_dir() == tmp_path / blackish.__version__
+
+    def test_filter_shared(self, tmp_path: Path) -> None:
+        mode = DEFAULT_MODE
+        with cache_dir() as workspace, patch(
+            "blackish.cache.SHARED_CACHE_DIR", tmp_path
+        ):
+            src = (workspace / "test.py").resolve()
+            src.write_text('print("hello")\n')
+            blackish.write_cache({}, [src], mode)
+            assert export_cache(mode) == 1
+            # The same contents in another checkout, under another name.
+            clone = tmp_path / "clone.py"
+            clone.write_text('print("hello")\n')
+            stub = tmp_path / "clone.pyi"
+            stub.write_text('print("hello")\n')
+            other = tmp_path / "other.py"
+            other.write_text('print("world")\n')
+            todo, done = blackish.filter_shared({clone, stub, other}, mode)
+            assert todo == {stub, other}
+            assert done == {clone}
+            short_mode = replace(mode, line_length=1)
+            todo, done = blackish.filter_shared({clone}, short_mode)
+            assert todo == {clone}
+            assert done == set()
+
+    @event_loop()
+    def test_shared_cache_multiple_files(self, tmp_path: Path) -> None:
+        mode = DEFAULT_MODE
+        shared_cache_dir = tmp_path / "shared"
+        with cache_dir() as workspace, patch(
+            "blackish.cache.SHARED_CACHE_DIR", shared_cache_dir
+        ), patch("concurrent.futures.ProcessPoolExecutor", new=ThreadPoolExecutor):
+            one = (workspace / "one.py").resolve()
+            one.write_text("print('hello')")
+            two = (workspace / "two.py").resolve()
+            two.write_text("print('hello')")
+            shared_cache_dir.mkdir()
+            shared_cache_file = get_shared_cache_file(mode)
+            assert shared_cache_file is not None
+            shared_cache_file.write_text(get_file_hash(one) + "\n")
+            invokeBlack([str(one)])
+            # Known to be well formatted, so it's left alone.
+            assert one.read_text() == "print('hello')"
+            assert str(one) in blackish.read_cache(mode)
+            two.write_text("print('hello')")
+            invokeBlack([str(workspace)])
+            assert two.read_text() == "print('hello')"
+            assert str(two) in blackish.read_cache(mode)
+
+    def test_cache_export_option(self, tmp_path: Path) -> None:
+        mode = DEFAULT_MODE
+        with cache_dir() as workspace:
+            src = (workspace / "test.py").resolve()
+            src.write_text('print("hello")\n')
+            blackish.write_cache({}, [src], mode)
+            runner = BlackRunner()
+            result = runner.invoke(blackish.main, ["--cache-export"])
+            assert result.exit_code == 1
+            assert "BLACK_SHARED_CACHE_DIR" in result.stderr
+            with patch("blackish.cache.SHARED_CACHE_DIR", tmp_path):
+                result = runner.invoke(blackish.main, ["--cache-export"])
+                assert result.exit_code == 0
+                shared_cache_file = get_shared_cache_file(mode)
+                assert shared_cache_file is not None
+                assert shared_cache_file.read_text() == get_file_hash(src) + "\n"
+
     def test_read_cache_line_lengths(self) -> None:
         mode = DEFAULT_MODE
         short_mode = replace(DEFAULT_MODE, line_length=1)
@@ -1957,6 +2776,71 @@ class TestFileCollection:
         )
         assert sorted(expected) == sorted(sources)
 
+    def test_gen_python_files_infos(self) -> None:
+        path = THIS_DIR / "data" / "include_exclude_tests"
+        include = re.compile(r"\.pyi?$")
+        exclude = re.compile(r"/exclude/|/\.definitely_exclude/")
+        report = blackish.Report()
+        infos: Dict[Path, SourceInfo] = {}
+        sources = list(
+            blackish.gen_python_files(
+                path.iterdir(),
+                THIS_DIR.resolve(),
+                include,
+                exclude,
+                None,
+                None,
+                report,
+                None,
+                verbose=False,
+                quiet=False,
+                infos=infos,
+            )
+        )
+        assert sources
+        assert sorted(infos) == sorted(sources)
+        for src in sources:
+            assert infos[src].path == src.resolve()
+            stat = infos[src].stat
+            assert stat is not None
+            assert stat.st_size == src.stat().st_size
+
+    def test_gen_python_files_resolves_only_symlinks(self, tmp_path: Path) -> None:
+        root = tmp_path.resolve() / "root"
+        package = root / "package"
+        (package / "sub").mkdir(parents=True)
+        (package / "a.py").touch()
+        (package / "sub" / "b.py").touch()
+        outside = tmp_path / "outside.py"
+        outside.touch()
+        try:
+            (package / "link.py").symlink_to(outside)
+        except OSError:
+            pytest.skip("symbolic links aren't supported")
+        report = MagicMock()
+        resolve = Path.resolve
+        with patch.object(Path, "resolve", autospec=True, side_effect=resolve) as mock:
+            sources = list(
+                blackish.gen_python_files(
+                    [package],
+                    root,
+                    re.compile(r"\.pyi?$"),
+                    re.compile(""),
+                    None,
+                    None,
+                    report,
+                    None,
+                    verbose=False,
+                    quiet=False,
+                )
+            )
+        assert sorted(sources) == [package / "a.py", package / "sub" / "b.py"]
+        assert sorted(call[0][0].name for call in mock.call_args_list) == [
+            "link.py",
+            "package",
+        ]
+        report.path_ignored.assert_called_once()
+
     def test_nested_gitignore(self) -> None:
         path = Path(THIS_DIR / "data" / "nested_gitignore_tests")
         include = re.compile(r"\.pyi?$")
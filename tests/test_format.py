@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import replace
 from typing import Any, Iterator, List
 from unittest.mock import patch
@@ -165,6 +166,40 @@ def test_fast_cases(filename: str) -> None:
     assert_format(source, expected, fast=True)
 
 
+@pytest.mark.parametrize("filename", all_data_cases("simple_cases"))
+def test_parallel_format(filename: str) -> None:
+    # Tiny groups make every top-level statement that can be formatted on its own
+    # a separate task, without changing the output.
+    source, expected = read_data("simple_cases", filename)
+    with patch("blackish.PARALLEL_GROUP_SIZE", 1), ThreadPoolExecutor() as executor:
+        actual = blackish.format_str(source, mode=DEFAULT_MODE, executor=executor)
+    assert actual == expected
+
+
+def test_second_pass_only_after_added_trailing_commas() -> None:
+    with patch(
+        "blackish._format_str_once", wraps=blackish._format_str_once
+    ) as second_pass:
+        assert blackish.format_str("x  =  [1, 2]", mode=DEFAULT_MODE) == "x = [1, 2]\n"
+        second_pass.assert_not_called()
+        source = "call(" + ", ".join(f"argument_{i}" for i in range(10)) + ")"
+        expected = (
+            "call(\n" + "".join(f"    argument_{i},\n" for i in range(10)) + ")\n"
+        )
+        assert blackish.format_str(source, mode=DEFAULT_MODE) == expected
+        second_pass.assert_called_once()
+
+
+def test_stability_check_reuses_second_pass() -> None:
+    with patch("blackish.assert_stable", wraps=blackish.assert_stable) as check:
+        source = "call(" + ", ".join(f"argument_{i}" for i in range(10)) + ")"
+        blackish.format_file_contents(source, fast=False, mode=DEFAULT_MODE)
+        # The second pass left the first pass' result alone, so it's stable.
+        check.assert_not_called()
+        blackish.format_file_contents("x  =  [1, 2]", fast=False, mode=DEFAULT_MODE)
+        check.assert_called_once()
+
+
 def test_python_2_hint() -> None:
     with pytest.raises(blackish.parsing.InvalidInput) as exc_info:
         assert_format("print 'daylily'", "print 'daylily'")